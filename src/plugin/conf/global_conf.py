@@ -7,3 +7,65 @@ LOG = {
         }
     }
 }
+
+AZURE_CLOUD = {
+    "resource_manager_endpoint": "https://management.azure.com",
+    "authority_host": "https://login.microsoftonline.com",
+    "disable_instance_discovery": False,
+}
+
+HTTP_SESSION = {
+    "pool_connections": 10,
+    "pool_maxsize": 50,
+    "async_pool_maxsize": 100,
+    "connect_timeout": 10,
+    "read_timeout": 60,
+}
+
+THROTTLING = {
+    "retry_total": 5,
+    "retry_backoff_factor": 1.0,
+    "retry_backoff_max": 60,
+    "requests_per_second": 20,
+    "burst": 100,
+    "low_remaining_threshold": 10,
+    "low_remaining_delay": 2.0,
+}
+
+CONCURRENCY = {
+    "billing_accounts": 4,
+    "customer_tenants": 10,
+    "departments": 10,
+    "async_customer_tenants": 50,
+}
+
+TOKEN_CACHE = {
+    "refresh_margin": 300,
+    "idle_timeout": 600,
+    "max_size": 100,
+}
+
+CLIENT_REGISTRY = {
+    "idle_timeout": 600,
+    "max_size": 100,
+}
+
+MANAGEMENT_GROUP_CACHE = {
+    "ttl": 3600,
+    "max_size": 100,
+    "path": None,
+}
+
+ASYNC_SYNC = False
+
+INCREMENTAL_SYNC = {
+    "enabled": False,
+    "path": "/tmp/plugin-azure-identity-account-collector/state.db",
+    "max_age": 86400,
+}
+
+CHECKPOINT = {
+    "enabled": False,
+    "path": "/tmp/plugin-azure-identity-account-collector/state.db",
+    "max_age": 3600,
+}
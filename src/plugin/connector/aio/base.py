@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Callable
+
+import aiohttp
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.mgmt.resource.resources.aio import ResourceManagementClient
+from azure.mgmt.resource.subscriptions.aio import SubscriptionClient
+from azure.mgmt.managementgroups.aio import ManagementGroupsAPI
+from azure.mgmt.billing.aio import BillingManagementClient
+from spaceone.core.connector import BaseConnector
+
+from plugin.connector.aio.http_session import AsyncHTTPSession
+from plugin.connector.azure_cloud import get_arm_scope, get_azure_cloud_conf
+from plugin.connector.throttling import (
+    AsyncThrottlingPolicy,
+    RetryConfig,
+    request_budget,
+)
+from plugin.connector.token_cache import token_cache
+from plugin.error.common import *
+from plugin.lib.metrics import count
+
+__all__ = ["AsyncAzureBaseConnector"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncAzureBaseConnector(BaseConnector):
+    """Async variant of AzureBaseConnector built on the azure.mgmt aio clients.
+
+    Use it as an async context manager so that its clients are closed. When an
+    AsyncHTTPSession is given, the raw REST calls and all aio clients share it;
+    otherwise the connector owns a session of its own.
+    """
+
+    connector_name = None
+
+    def __init__(self, *args, http_session: AsyncHTTPSession = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._owns_http_session = http_session is None
+        self.http_session = http_session or AsyncHTTPSession()
+        self._clients = {}
+
+    def set_connect(self, secret_data: dict, tenant_id: str = None) -> None:
+        if tenant_id:
+            secret_data = {**secret_data, "tenant_id": tenant_id}
+
+        self.tenant_id = secret_data["tenant_id"]
+        self.subscription_id = secret_data.get("subscription_id", "")
+        self._credential = token_cache.get_async_credential(secret_data)
+
+    @property
+    def resource_client(self) -> ResourceManagementClient:
+        return self._get_client(
+            ResourceManagementClient, subscription_id=self.subscription_id
+        )
+
+    @property
+    def management_groups_client(self) -> ManagementGroupsAPI:
+        return self._get_client(ManagementGroupsAPI)
+
+    @property
+    def billing_client(self) -> BillingManagementClient:
+        return self._get_client(
+            BillingManagementClient, subscription_id=self.subscription_id
+        )
+
+    @property
+    def subscription_client(self) -> SubscriptionClient:
+        return self._get_client(SubscriptionClient)
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+        if self._owns_http_session:
+            await self.http_session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _get_client(self, client_cls, **kwargs):
+        if (client := self._clients.get(client_cls)) is None:
+            client = self._clients[client_cls] = client_cls(
+                credential=self._credential,
+                base_url=get_azure_cloud_conf()["resource_manager_endpoint"],
+                credential_scopes=[get_arm_scope()],
+                transport=AioHttpTransport(
+                    session=self.http_session.session, session_owner=False
+                ),
+                per_retry_policies=[AsyncThrottlingPolicy(self.tenant_id)],
+                **RetryConfig().to_client_kwargs(),
+                **kwargs,
+            )
+        return client
+
+    @staticmethod
+    async def _list_with_query(list_func: Callable, **query) -> AsyncIterator:
+        query = {key: value for key, value in query.items() if value is not None}
+        has_items = False
+        try:
+            async for item in list_func(**query):
+                has_items = True
+                yield item
+        except HttpResponseError as e:
+            if has_items or not query or e.status_code != 400:
+                raise
+            _LOGGER.debug(f"[_list_with_query] {query} is not supported => {e}")
+            async for item in list_func():
+                yield item
+
+    async def _request_get(self, url: str, secret_data: dict) -> aiohttp.ClientResponse:
+        tenant_id = secret_data["tenant_id"]
+        retry_config = RetryConfig()
+
+        attempt = 0
+        while True:
+            await request_budget.acquire_async(tenant_id)
+            headers = await self._make_request_headers(secret_data)
+            count(tenant_id, "requests" if attempt == 0 else "retries")
+
+            try:
+                response = await self.http_session.get(url, headers=headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= retry_config.total:
+                    raise
+                delay = retry_config.get_delay(attempt)
+                _LOGGER.debug(f"[_request_get] {e} => retry after {delay:.1f}s")
+            else:
+                request_budget.observe(tenant_id, response.headers)
+                if response.ok:
+                    return response
+
+                count(tenant_id, f"status_{response.status}")
+
+                if (
+                    not retry_config.is_retryable(response.status)
+                    or attempt >= retry_config.total
+                ):
+                    response.raise_for_status()
+
+                delay = retry_config.get_delay(attempt, response.headers)
+                _LOGGER.debug(
+                    f"[_request_get] {response.status} {url} => retry after {delay:.1f}s"
+                )
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _make_request_headers(self, secret_data, access_token=None):
+        if not access_token:
+            access_token = await self._get_access_token(secret_data)
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+
+        return headers
+
+    @staticmethod
+    async def _get_access_token(secret_data: dict):
+        try:
+            credential = token_cache.get_async_credential(secret_data)
+            access_token = await credential.get_token(get_arm_scope())
+            return access_token.token
+        except Exception as e:
+            _LOGGER.error(f"[ERROR] _get_access_token :{e}")
+            raise ERROR_INVALID_TOKEN(token=e)
@@ -0,0 +1,92 @@
+import logging
+from typing import AsyncIterator
+
+from spaceone.core.error import ERROR_UNKNOWN
+
+from plugin.connector.aio.base import AsyncAzureBaseConnector
+from plugin.connector.aio.http_session import AsyncHTTPSession
+from plugin.connector.azure_cloud import make_arm_url
+from plugin.lib.checkpoint import get_checkpoint
+from plugin.lib.metrics import count
+from plugin.lib.payload import loads, project
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncBillingConnector(AsyncAzureBaseConnector):
+    connector_name = "AsyncBillingConnector"
+
+    def __init__(self, *args, http_session: AsyncHTTPSession = None, **kwargs):
+        super().__init__(*args, http_session=http_session, **kwargs)
+        self.set_connect(*args, **kwargs)
+
+    async def list_subscription(
+        self,
+        options: dict,
+        secret_data: dict,
+        agreement_type: str,
+        billing_account_id: str,
+    ) -> AsyncIterator:
+        if agreement_type == "EnterpriseAgreement":
+            subscriptions = self.list_subscription_http(secret_data, billing_account_id)
+            async for subscription in subscriptions:
+                yield subscription
+        else:
+            if sync_customers := options.get("sync_customers"):
+                for customer_id in sync_customers:
+                    async for (
+                        subscription
+                    ) in self.billing_client.billing_subscriptions.list_by_customer(
+                        billing_account_name=billing_account_id,
+                        api_version="2020-05-01",
+                        customer_name=customer_id,
+                    ):
+                        yield subscription
+            else:
+                async for (
+                    subscription
+                ) in self.billing_client.billing_subscriptions.list_by_billing_account(
+                    billing_account_name=billing_account_id,
+                    api_version="2020-12-15-privatepreview",
+                ):
+                    yield subscription
+
+    async def list_subscription_http(
+        self, secret_data: dict, billing_account_id: str, projection: dict = None
+    ) -> AsyncIterator[dict]:
+        api_version = "2022-10-01-privatepreview"
+        url = make_arm_url(
+            f"/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/billingSubscriptions?api-version={api_version}"
+        )
+        try:
+            async for subscription in self._list_by_next_link(
+                url, secret_data, projection
+            ):
+                yield subscription
+        except Exception as e:
+            raise ERROR_UNKNOWN(message=f"[ERROR] list_subscription_http {e}")
+
+    async def _list_by_next_link(
+        self, url: str, secret_data: dict, projection: dict = None
+    ) -> AsyncIterator[dict]:
+        checkpoint = get_checkpoint()
+        next_link = url
+        while next_link:
+            page_key = f"page:{next_link}"
+            if checkpoint and (page := checkpoint.get(page_key)) is not None:
+                values, next_link = page["value"], page["nextLink"]
+            else:
+                response = await self._request_get(next_link, secret_data)
+                count(secret_data["tenant_id"], "pages")
+                response_json = loads(await response.read())
+                values = [
+                    project(value, projection)
+                    for value in response_json.get("value", [])
+                ]
+                next_link = response_json.get("nextLink", None)
+
+                if checkpoint:
+                    checkpoint.set(page_key, {"value": values, "nextLink": next_link})
+
+            for value in values:
+                yield value
@@ -0,0 +1,55 @@
+import logging
+
+import aiohttp
+
+from plugin.connector.http_session import get_http_session_conf
+
+__all__ = ["AsyncHTTPSession"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncHTTPSession:
+    """Keep-alive aiohttp session shared by the async connectors of one sync.
+
+    aiohttp sessions are bound to an event loop, so unlike the sync HTTPSession
+    this one is owned by the async sync path and closed when it ends. The aio SDK
+    clients are given the same session, so raw REST calls and SDK calls share one
+    connection pool.
+    """
+
+    def __init__(self, **conf):
+        self._conf = conf
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            conf = {**get_http_session_conf(), **self._conf}
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=conf["async_pool_maxsize"]),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=conf["connect_timeout"],
+                    sock_read=conf["read_timeout"],
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+            _LOGGER.debug(f"[AsyncHTTPSession] create session (conf: {conf})")
+        return self._session
+
+    async def get(self, url: str, headers: dict = None) -> aiohttp.ClientResponse:
+        async with self.session.get(url, headers=headers) as response:
+            # the body is read before the connection goes back to the pool
+            await response.read()
+        return response
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,27 @@
+import logging
+from typing import AsyncIterator, Iterable
+
+from plugin.connector.aio.base import AsyncAzureBaseConnector
+from plugin.connector.aio.http_session import AsyncHTTPSession
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncManagementGroupsConnector(AsyncAzureBaseConnector):
+    connector_name = "AsyncManagementGroupsConnector"
+
+    def __init__(self, *args, http_session: AsyncHTTPSession = None, **kwargs):
+        super().__init__(*args, http_session=http_session, **kwargs)
+        self.set_connect(*args, **kwargs)
+
+    async def list_entities(
+        self, select: Iterable[str] = None, view: str = None, entity_type: str = None
+    ) -> AsyncIterator:
+        entities = self._list_with_query(
+            self.management_groups_client.entities.list,
+            select=",".join(select) if select else None,
+            view=view,
+        )
+        async for entity in entities:
+            if entity_type is None or entity.type == entity_type:
+                yield entity
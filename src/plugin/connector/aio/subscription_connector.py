@@ -0,0 +1,19 @@
+import logging
+from typing import AsyncIterator
+
+from plugin.connector.aio.base import AsyncAzureBaseConnector
+from plugin.connector.aio.http_session import AsyncHTTPSession
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncSubscriptionConnector(AsyncAzureBaseConnector):
+    connector_name = "AsyncSubscriptionConnector"
+
+    def __init__(self, *args, http_session: AsyncHTTPSession = None, **kwargs):
+        super().__init__(*args, http_session=http_session, **kwargs)
+        self.set_connect(*args, **kwargs)
+
+    def list_subscriptions(self) -> AsyncIterator:
+        subscriptions = self.subscription_client.subscriptions.list()
+        return subscriptions
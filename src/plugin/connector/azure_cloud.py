@@ -0,0 +1,26 @@
+from spaceone.core import config
+
+__all__ = ["get_azure_cloud_conf", "get_arm_scope", "make_arm_url"]
+
+
+def get_azure_cloud_conf() -> dict:
+    """Endpoints of the Azure cloud to collect from (AZURE_CLOUD global config).
+
+    Besides sovereign clouds, this lets a sync run against a local mock of ARM
+    and AAD. Authorities that Azure does not know about (Azure Stack, a mock)
+    also need `disable_instance_discovery`.
+    """
+    return config.get_global("AZURE_CLOUD")
+
+
+def get_arm_scope() -> str:
+    """Token scope of the resource manager endpoint, e.g.
+    https://management.usgovcloudapi.net/.default for Azure Government.
+    """
+    endpoint = get_azure_cloud_conf()["resource_manager_endpoint"].rstrip("/")
+    return f"{endpoint}/.default"
+
+
+def make_arm_url(path: str) -> str:
+    endpoint = get_azure_cloud_conf()["resource_manager_endpoint"].rstrip("/")
+    return f"{endpoint}{path}"
@@ -1,14 +1,23 @@
 import logging
-import os
+import time
+from typing import TYPE_CHECKING, Callable, Iterator
 
-from azure.identity import ClientSecretCredential, DefaultAzureCredential
-from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
-from azure.mgmt.managementgroups import ManagementGroupsAPI
-from azure.mgmt.billing import BillingManagementClient
+import requests
+from azure.core.exceptions import HttpResponseError
 from spaceone.core.connector import BaseConnector
 
+from plugin.connector.client_registry import AzureClients, client_registry
+from plugin.connector.http_session import http_session
+from plugin.connector.throttling import RetryConfig, request_budget
+from plugin.connector.token_cache import token_cache
+from plugin.lib.metrics import count
 from plugin.error.common import *
 
+if TYPE_CHECKING:
+    from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
+    from azure.mgmt.managementgroups import ManagementGroupsAPI
+    from azure.mgmt.billing import BillingManagementClient
+
 __all__ = ["AzureBaseConnector"]
 
 _LOGGER = logging.getLogger("spaceone")
@@ -22,36 +31,81 @@ class AzureBaseConnector(BaseConnector):
 
     def set_connect(self, secret_data: dict, tenant_id: str = None) -> None:
         if tenant_id:
-            secret_data["tenant_id"] = tenant_id
-        subscription_id = secret_data.get("subscription_id", "")
-
-        os.environ["AZURE_SUBSCRIPTION_ID"] = subscription_id
-        os.environ["AZURE_TENANT_ID"] = secret_data["tenant_id"]
-        os.environ["AZURE_CLIENT_ID"] = secret_data["client_id"]
-        os.environ["AZURE_CLIENT_SECRET"] = secret_data["client_secret"]
-
-        credential = ClientSecretCredential(
-            secret_data["tenant_id"],
-            secret_data["client_id"],
-            secret_data["client_secret"],
-            subscription_id=subscription_id,
-            additionally_allowed_tenants=["*"],
-        )
-
-        self.resource_client: ResourceManagementClient = ResourceManagementClient(
-            credential=credential, subscription_id=subscription_id
-        )
-        self.management_groups_client: ManagementGroupsAPI = ManagementGroupsAPI(
-            credential=credential
-        )
-
-        self.billing_client: BillingManagementClient = BillingManagementClient(
-            credential=credential, subscription_id=subscription_id
-        )
-
-        self.subscription_client: SubscriptionClient = SubscriptionClient(
-            credential=DefaultAzureCredential()
-        )
+            secret_data = {**secret_data, "tenant_id": tenant_id}
+
+        self._clients: AzureClients = client_registry.get_clients(secret_data)
+
+    @property
+    def resource_client(self) -> "ResourceManagementClient":
+        return self._clients.resource_client
+
+    @property
+    def management_groups_client(self) -> "ManagementGroupsAPI":
+        return self._clients.management_groups_client
+
+    @property
+    def billing_client(self) -> "BillingManagementClient":
+        return self._clients.billing_client
+
+    @property
+    def subscription_client(self) -> "SubscriptionClient":
+        return self._clients.subscription_client
+
+    @staticmethod
+    def _list_with_query(list_func: Callable, **query) -> Iterator:
+        """Yield from list_func(**query), the query options being pushed to the
+        server. If the endpoint rejects them before returning anything, the
+        listing is retried without them and the caller filters on its side.
+        """
+        query = {key: value for key, value in query.items() if value is not None}
+        has_items = False
+        try:
+            for item in list_func(**query):
+                has_items = True
+                yield item
+        except HttpResponseError as e:
+            if has_items or not query or e.status_code != 400:
+                raise
+            _LOGGER.debug(f"[_list_with_query] {query} is not supported => {e}")
+            yield from list_func()
+
+    def _request_get(self, url: str, secret_data: dict) -> requests.Response:
+        tenant_id = secret_data["tenant_id"]
+        retry_config = RetryConfig()
+
+        attempt = 0
+        while True:
+            request_budget.acquire(tenant_id)
+            headers = self._make_request_headers(secret_data)
+            count(tenant_id, "requests" if attempt == 0 else "retries")
+
+            try:
+                response = http_session.get(url, headers=headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retry_config.total:
+                    raise
+                delay = retry_config.get_delay(attempt)
+                _LOGGER.debug(f"[_request_get] {e} => retry after {delay:.1f}s")
+            else:
+                request_budget.observe(tenant_id, response.headers)
+                if response.ok:
+                    return response
+
+                count(tenant_id, f"status_{response.status_code}")
+
+                if (
+                    not retry_config.is_retryable(response.status_code)
+                    or attempt >= retry_config.total
+                ):
+                    response.raise_for_status()
+
+                delay = retry_config.get_delay(attempt, response.headers)
+                _LOGGER.debug(
+                    f"[_request_get] {response.status_code} {url} => retry after {delay:.1f}s"
+                )
+
+            time.sleep(delay)
+            attempt += 1
 
     def _make_request_headers(self, secret_data, access_token=None):
         if not access_token:
@@ -66,12 +120,7 @@ class AzureBaseConnector(BaseConnector):
     @staticmethod
     def _get_access_token(secret_data: dict):
         try:
-            credential = ClientSecretCredential(
-                additionally_allowed_tenants=["*"], **secret_data
-            )
-            scopes = ["https://management.azure.com/.default"]
-            token_info = credential.get_token(*scopes)
-            return token_info.token
+            return token_cache.get_token(secret_data)
         except Exception as e:
             _LOGGER.error(f"[ERROR] _get_access_token :{e}")
             raise ERROR_INVALID_TOKEN(token=e)
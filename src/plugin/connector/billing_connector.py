@@ -1,9 +1,13 @@
 import logging
-import requests
+from typing import Iterator
 
 from spaceone.core.error import ERROR_UNKNOWN
 
+from plugin.connector.azure_cloud import make_arm_url
 from plugin.connector.base import AzureBaseConnector
+from plugin.lib.checkpoint import get_checkpoint
+from plugin.lib.metrics import count
+from plugin.lib.payload import loads, project
 
 _LOGGER = logging.getLogger("spaceone")
 
@@ -14,13 +18,12 @@ class BillingConnector(AzureBaseConnector):
     def __init__(self, *args, **kwargs):
         super().set_connect(*args, **kwargs)
         super().__init__(*args, **kwargs)
-        self.next_link = None
 
-    def list_billing_accounts(self, secret_data: dict) -> list:
+    def list_billing_accounts(self, secret_data: dict) -> Iterator:
         billing_accounts = self.billing_client.billing_accounts.list(
             api_version="2022-10-01-privatepreview"
         )
-        return list(billing_accounts)
+        return billing_accounts
 
     def list_customers(self, billing_account_id: str) -> list:
         customers = self.billing_client.customers.list_by_billing_account(
@@ -28,105 +31,96 @@ class BillingConnector(AzureBaseConnector):
         )
         return list(customers)
 
-    def list_departments(self, secret_data: dict, billing_account_id: str) -> list:
-        departments = []
+    def list_departments(
+        self, secret_data: dict, billing_account_id: str, projection: dict = None
+    ) -> Iterator[dict]:
+        api_version = "2020-12-15-privatepreview"
+        url = make_arm_url(
+            f"/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/departments?api-version={api_version}"
+        )
         try:
-            api_version = "2020-12-15-privatepreview"
-            self.next_link = f"https://management.azure.com/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/departments?api-version={api_version}"
-
-            while self.next_link:
-                url = self.next_link
-
-                headers = self._make_request_headers(secret_data)
-                response = requests.get(url=url, headers=headers)
-                response_json = response.json()
-                response_value = response_json.get("value", [])
-
-                self.next_link = response_json.get("nextLink", None)
-                departments.extend(response_value)
-
+            yield from self._list_by_next_link(url, secret_data, projection)
         except Exception as e:
             raise ERROR_UNKNOWN(message=f"[ERROR] list_departments {e}")
 
-        return departments
-
     def list_subscription_by_department(
         self,
         options: dict,
         secret_data: dict,
         department_id: str,
         billing_account_id: str,
-    ) -> list:
-        subscriptions = []
+        projection: dict = None,
+    ) -> Iterator[dict]:
+        api_version = "2020-12-15-privatepreview"
+        url = make_arm_url(
+            f"/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/departments/{department_id}/billingSubscriptions?api-version={api_version}"
+        )
         try:
-            api_version = "2020-12-15-privatepreview"
-            self.next_link = f"https://management.azure.com/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/departments/{department_id}/billingSubscriptions?api-version={api_version}"
-
-            while self.next_link:
-                url = self.next_link
-
-                headers = self._make_request_headers(secret_data)
-                response = requests.get(url=url, headers=headers)
-                response_json = response.json()
-                response_value = response_json.get("value", [])
-
-                self.next_link = response_json.get("nextLink", None)
-                subscriptions.extend(response_value)
+            yield from self._list_by_next_link(url, secret_data, projection)
         except Exception as e:
             raise ERROR_UNKNOWN(message=f"[ERROR] list_subscription_by_department {e}")
 
-        return subscriptions
-
     def list_subscription(
         self,
         options: dict,
         secret_data: dict,
         agreement_type: str,
         billing_account_id: str,
-    ) -> list:
-        subscriptions = []
-
+    ) -> Iterator:
         if agreement_type == "EnterpriseAgreement":
-            subscriptions = self.list_subscription_http(secret_data, billing_account_id)
+            yield from self.list_subscription_http(secret_data, billing_account_id)
         else:
             if sync_customers := options.get("sync_customers"):
                 for customer_id in sync_customers:
-                    customer_subscriptions = (
-                        self.billing_client.billing_subscriptions.list_by_customer(
-                            billing_account_name=billing_account_id,
-                            api_version="2020-05-01",
-                            customer_name=customer_id,
-                        )
-                    )
-                    subscriptions.extend(customer_subscriptions)
-            else:
-                subscriptions = (
-                    self.billing_client.billing_subscriptions.list_by_billing_account(
+                    yield from self.billing_client.billing_subscriptions.list_by_customer(
                         billing_account_name=billing_account_id,
-                        api_version="2020-12-15-privatepreview",
+                        api_version="2020-05-01",
+                        customer_name=customer_id,
                     )
+            else:
+                yield from self.billing_client.billing_subscriptions.list_by_billing_account(
+                    billing_account_name=billing_account_id,
+                    api_version="2020-12-15-privatepreview",
                 )
-        return subscriptions
 
     def list_subscription_http(
-        self, secret_data: dict, billing_account_id: str
-    ) -> list:
-        subscriptions = []
+        self, secret_data: dict, billing_account_id: str, projection: dict = None
+    ) -> Iterator[dict]:
+        api_version = "2022-10-01-privatepreview"
+        url = make_arm_url(
+            f"/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/billingSubscriptions?api-version={api_version}"
+        )
         try:
-            api_version = "2022-10-01-privatepreview"
-            self.next_link = f"https://management.azure.com/providers/Microsoft.Billing/billingAccounts/{billing_account_id}/billingSubscriptions?api-version={api_version}"
-
-            while self.next_link:
-                url = self.next_link
-
-                headers = self._make_request_headers(secret_data)
-                response = requests.get(url=url, headers=headers)
-                response_json = response.json()
-                response_value = response_json.get("value", [])
-
-                self.next_link = response_json.get("nextLink", None)
-                subscriptions.extend(response_value)
+            yield from self._list_by_next_link(url, secret_data, projection)
         except Exception as e:
             raise ERROR_UNKNOWN(message=f"[ERROR] list_subscription_http {e}")
 
-        return subscriptions
+    def _list_by_next_link(
+        self, url: str, secret_data: dict, projection: dict = None
+    ) -> Iterator[dict]:
+        # The paging cursor is kept local so that one connector can page
+        # several listings from different threads at the same time. Pages are
+        # requested only when the previous one has been consumed. Projected items
+        # do not keep the unused parts of the page alive. With a checkpoint, each
+        # page is recorded with its nextLink cursor, so a resumed sync replays
+        # the pages it already has and continues from the first missing one.
+        checkpoint = get_checkpoint()
+        next_link = url
+        while next_link:
+            page_key = f"page:{next_link}"
+            if checkpoint and (page := checkpoint.get(page_key)) is not None:
+                values, next_link = page["value"], page["nextLink"]
+                yield from values
+                continue
+
+            response = self._request_get(next_link, secret_data)
+            count(secret_data["tenant_id"], "pages")
+            response_json = loads(response.content)
+            values = [
+                project(value, projection) for value in response_json.get("value", [])
+            ]
+            next_link = response_json.get("nextLink", None)
+
+            if checkpoint:
+                checkpoint.set(page_key, {"value": values, "nextLink": next_link})
+            yield from values
@@ -0,0 +1,113 @@
+import logging
+import threading
+
+from typing import TYPE_CHECKING
+
+from spaceone.core import config
+
+from plugin.connector.azure_cloud import get_arm_scope, get_azure_cloud_conf
+from plugin.connector.throttling import RetryConfig, ThrottlingPolicy
+from plugin.connector.token_cache import token_cache
+from plugin.lib.keyed_store import KeyedStore, make_secret_key
+
+if TYPE_CHECKING:
+    from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
+    from azure.mgmt.managementgroups import ManagementGroupsAPI
+    from azure.mgmt.billing import BillingManagementClient
+
+__all__ = ["AzureClients", "ClientRegistry", "client_registry"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AzureClients:
+    """SDK clients of one tenant/client, each created on first use.
+
+    The SDK packages are imported on first use as well, so that a sync only
+    loads the ones it needs.
+    """
+
+    def __init__(self, secret_data: dict):
+        self.tenant_id = secret_data["tenant_id"]
+        self.subscription_id = secret_data.get("subscription_id", "")
+        self._credential = token_cache.get_credential(secret_data)
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def resource_client(self) -> "ResourceManagementClient":
+        from azure.mgmt.resource import ResourceManagementClient
+
+        return self._get_client(
+            ResourceManagementClient, subscription_id=self.subscription_id
+        )
+
+    @property
+    def management_groups_client(self) -> "ManagementGroupsAPI":
+        from azure.mgmt.managementgroups import ManagementGroupsAPI
+
+        return self._get_client(ManagementGroupsAPI)
+
+    @property
+    def billing_client(self) -> "BillingManagementClient":
+        from azure.mgmt.billing import BillingManagementClient
+
+        return self._get_client(
+            BillingManagementClient, subscription_id=self.subscription_id
+        )
+
+    @property
+    def subscription_client(self) -> "SubscriptionClient":
+        from azure.mgmt.resource import SubscriptionClient
+
+        return self._get_client(SubscriptionClient)
+
+    def _get_client(self, client_cls, **kwargs):
+        with self._lock:
+            if (client := self._clients.get(client_cls)) is None:
+                client = self._clients[client_cls] = client_cls(
+                    credential=self._credential,
+                    base_url=get_azure_cloud_conf()["resource_manager_endpoint"],
+                    credential_scopes=[get_arm_scope()],
+                    per_retry_policies=[ThrottlingPolicy(self.tenant_id)],
+                    **RetryConfig().to_client_kwargs(),
+                    **kwargs,
+                )
+        return client
+
+
+class ClientRegistry:
+    """Process-wide registry of AzureClients keyed by tenant and client.
+
+    The entries are kept in a KeyedStore bounded by `idle_timeout` and
+    `max_size`. Evicted clients are not closed explicitly because a connector
+    may still hold them; their pools are released once the last reference goes
+    away.
+    """
+
+    def __init__(self, conf: dict = None):
+        self._conf = conf
+        self._entries = KeyedStore("ClientRegistry")
+
+    @property
+    def conf(self) -> dict:
+        if self._conf is None:
+            self._conf = config.get_global("CLIENT_REGISTRY")
+        return self._conf
+
+    def get_clients(self, secret_data: dict) -> AzureClients:
+        # resource and billing clients are bound to a subscription
+        return self._entries.get(
+            make_secret_key(secret_data, "subscription_id"),
+            lambda: AzureClients(secret_data),
+            self.conf,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+client_registry = ClientRegistry()
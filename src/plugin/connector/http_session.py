@@ -0,0 +1,72 @@
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from spaceone.core import config
+
+__all__ = ["HTTPSession", "http_session", "get_http_session_conf"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class HTTPSession:
+    """Shared, connection-pooled transport for the raw ARM REST calls.
+
+    The underlying `requests.Session` is built on first use from the
+    `HTTP_SESSION` global config, so every connector reuses the same
+    keep-alive connections to management.azure.com.
+    """
+
+    def __init__(self, **conf):
+        self._conf = conf
+        self._session = None
+        self._timeout = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def get(self, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, headers=headers, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        session = self.session
+        kwargs.setdefault("timeout", self._timeout)
+        return session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _build_session(self) -> requests.Session:
+        conf = {**get_http_session_conf(), **self._conf}
+
+        adapter = HTTPAdapter(
+            pool_connections=conf["pool_connections"],
+            pool_maxsize=conf["pool_maxsize"],
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        )
+        self._timeout = (conf["connect_timeout"], conf["read_timeout"])
+
+        _LOGGER.debug(f"[HTTPSession] create session (conf: {conf})")
+        return session
+
+
+def get_http_session_conf() -> dict:
+    return config.get_global("HTTP_SESSION")
+
+
+http_session = HTTPSession()
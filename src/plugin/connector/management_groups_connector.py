@@ -1,5 +1,5 @@
 import logging
-import asyncio
+from typing import Iterable, Iterator
 
 from azure.core.exceptions import HttpResponseError
 from plugin.connector.base import AzureBaseConnector
@@ -24,17 +24,30 @@ class ManagementGroupsConnector(AzureBaseConnector):
 
         return management_groups
 
-    def list_entities(self, secret_data: dict, tenant_id: str = None) -> list:
+    def list_entities(
+        self,
+        secret_data: dict,
+        tenant_id: str = None,
+        select: Iterable[str] = None,
+        view: str = None,
+        entity_type: str = None,
+    ) -> Iterator:
+        """List the entities of the tenant.
+
+        select and view (e.g. "SubscriptionsOnly") are pushed to the server as
+        $select and $view. entity_type is also checked on the client side, for
+        when the server rejected the query and everything was listed.
+        """
         self.set_connect(secret_data, tenant_id)
 
-        entities = []
-        try:
-            entities = self.management_groups_client.entities.list()
-        except HttpResponseError as e:
-            _LOGGER.error(f"[list_entities] Error: {e}")
-        except Exception as e:
-            _LOGGER.error(f"[list_entities] Error: {e}")
-        return entities
+        entities = self._list_with_query(
+            self.management_groups_client.entities.list,
+            select=",".join(select) if select else None,
+            view=view,
+        )
+        for entity in entities:
+            if entity_type is None or entity.type == entity_type:
+                yield entity
 
     def list_permissions(self, secret_data: dict, tenant_id: str = None) -> list:
         self.set_connect(secret_data, tenant_id)
@@ -1,4 +1,5 @@
 import logging
+from typing import Iterator
 
 from azure.core.exceptions import ClientAuthenticationError, HttpResponseError
 
@@ -22,9 +23,16 @@ class SubscriptionConnector(AzureBaseConnector):
         tenants = self.subscription_client.tenants.list()
         return tenants
 
-    def list_subscriptions(self) -> list:
+    def list_subscriptions(self) -> Iterator:
         subscriptions = self.subscription_client.subscriptions.list()
-        return list(subscriptions)
+        return subscriptions
+
+    def get_subscription_index(self) -> dict:
+        subscription_index = {}
+        for subscription in self.list_subscriptions():
+            if subscription_id := subscription.subscription_id:
+                subscription_index[subscription_id.lower()] = subscription
+        return subscription_index
 
     def get_subscription(
         self, secret_data: dict, subscription_id: str, tenant_id: str = None
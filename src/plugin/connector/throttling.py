@@ -0,0 +1,199 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Union
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy, SansIOHTTPPolicy
+from spaceone.core import config
+
+from plugin.lib.metrics import count
+
+__all__ = [
+    "RetryConfig",
+    "RequestBudget",
+    "ThrottlingPolicy",
+    "AsyncThrottlingPolicy",
+    "request_budget",
+]
+
+_LOGGER = logging.getLogger("spaceone")
+
+RETRY_STATUS_CODES = frozenset([408, 429, 500, 502, 503, 504])
+RATE_LIMIT_HEADER_PREFIX = "x-ms-ratelimit-remaining-"
+
+
+class RetryConfig:
+    """Retry settings shared by the raw REST paths and the SDK clients."""
+
+    def __init__(self, conf: dict = None):
+        conf = conf or get_throttling_conf()
+        self.total = conf["retry_total"]
+        self.backoff_factor = conf["retry_backoff_factor"]
+        self.backoff_max = conf["retry_backoff_max"]
+
+    def is_retryable(self, status_code: int) -> bool:
+        return status_code in RETRY_STATUS_CODES
+
+    def get_delay(self, attempt: int, headers: dict = None) -> float:
+        """Seconds to wait before the next attempt (`attempt` starts from 0).
+
+        A Retry-After header always wins and is honored as given, even when it
+        is 0 or longer than `backoff_max`. Otherwise exponential backoff with
+        full jitter is used, capped at `backoff_max`.
+        """
+        if headers:
+            retry_after = _parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+
+        backoff = min(self.backoff_factor * (2**attempt), self.backoff_max)
+        return random.uniform(0, backoff)
+
+    def to_client_kwargs(self) -> dict:
+        return {
+            "retry_total": self.total,
+            "retry_backoff_factor": self.backoff_factor,
+            "retry_backoff_max": self.backoff_max,
+        }
+
+
+class RequestBudget:
+    """Per-tenant request budget (token bucket).
+
+    `acquire` blocks until the tenant has budget left. `observe` reads the
+    `x-ms-ratelimit-remaining-*` response headers and holds the tenant back for
+    a while when ARM reports that its own quota is nearly exhausted.
+    """
+
+    def __init__(self, conf: dict = None):
+        self._conf = conf
+        self._buckets = {}
+        self._not_before = {}
+        self._lock = threading.Lock()
+
+    @property
+    def conf(self) -> dict:
+        if self._conf is None:
+            self._conf = get_throttling_conf()
+        return self._conf
+
+    def acquire(self, tenant_id: str) -> None:
+        while wait := self._try_acquire(tenant_id):
+            time.sleep(wait)
+
+    async def acquire_async(self, tenant_id: str) -> None:
+        while wait := self._try_acquire(tenant_id):
+            await asyncio.sleep(wait)
+
+    def _try_acquire(self, tenant_id: str) -> float:
+        """Take one request from the budget and return 0, or return the seconds
+        to wait before trying again.
+        """
+        rate = self.conf["requests_per_second"]
+        burst = self.conf["burst"]
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(tenant_id, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            wait = max(self._not_before.get(tenant_id, 0) - now, 0)
+
+            if not wait and tokens >= 1:
+                self._buckets[tenant_id] = (tokens - 1, now)
+                return 0
+
+            self._buckets[tenant_id] = (tokens, now)
+            return max(wait, (1 - tokens) / rate)
+
+    def observe(self, tenant_id: str, headers) -> None:
+        remaining = _get_min_remaining(headers)
+        if remaining is None or remaining > self.conf["low_remaining_threshold"]:
+            return
+
+        delay = self.conf["low_remaining_delay"]
+        _LOGGER.debug(
+            f"[RequestBudget] tenant_id: {tenant_id}, ratelimit remaining: {remaining} => hold for {delay}s"
+        )
+        with self._lock:
+            self._not_before[tenant_id] = max(
+                self._not_before.get(tenant_id, 0), time.monotonic() + delay
+            )
+
+
+class ThrottlingPolicy(SansIOHTTPPolicy):
+    """Applies the per-tenant request budget to the SDK client pipelines."""
+
+    def __init__(self, tenant_id: str, budget: RequestBudget = None):
+        super().__init__()
+        self.tenant_id = tenant_id
+        self.budget = budget or request_budget
+
+    def on_request(self, request):
+        self.budget.acquire(self.tenant_id)
+        count(self.tenant_id, "requests")
+
+    def on_response(self, request, response):
+        http_response = response.http_response
+        self.budget.observe(self.tenant_id, http_response.headers)
+        if http_response.status_code >= 400:
+            count(self.tenant_id, f"status_{http_response.status_code}")
+
+
+class AsyncThrottlingPolicy(AsyncHTTPPolicy):
+    """Applies the per-tenant request budget to the async SDK client pipelines."""
+
+    def __init__(self, tenant_id: str, budget: RequestBudget = None):
+        super().__init__()
+        self.tenant_id = tenant_id
+        self.budget = budget or request_budget
+
+    async def send(self, request):
+        await self.budget.acquire_async(self.tenant_id)
+        count(self.tenant_id, "requests")
+
+        response = await self.next.send(request)
+        http_response = response.http_response
+        self.budget.observe(self.tenant_id, http_response.headers)
+        if http_response.status_code >= 400:
+            count(self.tenant_id, f"status_{http_response.status_code}")
+        return response
+
+
+def get_throttling_conf() -> dict:
+    return config.get_global("THROTTLING")
+
+
+def _parse_retry_after(value: str) -> Union[float, None]:
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(retry_at.timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_min_remaining(headers) -> Union[int, None]:
+    remaining = None
+    for key, value in headers.items():
+        if not key.lower().startswith(RATE_LIMIT_HEADER_PREFIX):
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        remaining = value if remaining is None else min(remaining, value)
+
+    return remaining
+
+
+request_budget = RequestBudget()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from azure.core.credentials import AccessToken
+from spaceone.core import config
+
+from plugin.connector.azure_cloud import get_arm_scope, get_azure_cloud_conf
+from plugin.lib.keyed_store import KeyedStore, make_secret_key
+from plugin.lib.metrics import count, span
+
+if TYPE_CHECKING:
+    from azure.identity import ClientSecretCredential
+
+__all__ = [
+    "TokenCache",
+    "CachedTokenCredential",
+    "AsyncCachedTokenCredential",
+    "token_cache",
+]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class _TokenCacheEntry:
+    """Credential and tokens of one (tenant_id, client_id, secret)."""
+
+    def __init__(self):
+        self.credential = None
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+
+class TokenCache:
+    """Process-wide access token cache keyed by (tenant_id, client_id, scope).
+
+    Tokens are reused until `refresh_margin` seconds before they expire. Only one
+    thread refreshes a given tenant/client at a time, the others wait and reuse
+    its token.
+
+    Each tenant/client keeps its ClientSecretCredential (and MSAL pipeline) next
+    to its tokens, in a KeyedStore bounded by `idle_timeout` and `max_size`, so a
+    sync over many customer tenants does not keep a credential per tenant alive.
+    """
+
+    def __init__(self, conf: dict = None):
+        self._conf = conf
+        self.hits = 0
+        self.misses = 0
+        self._entries = KeyedStore("TokenCache")
+        self._lock = threading.Lock()
+
+    @property
+    def conf(self) -> dict:
+        if self._conf is None:
+            self._conf = config.get_global("TOKEN_CACHE")
+        return self._conf
+
+    def get_token(self, secret_data: dict, scope: str = None) -> str:
+        return self.get_access_token(secret_data, scope).token
+
+    def get_access_token(self, secret_data: dict, scope: str = None) -> AccessToken:
+        """Token for scope, by default the one of the resource manager endpoint."""
+        scope = scope or get_arm_scope()
+        entry = self._get_entry(secret_data)
+
+        if access_token := self._get_valid_token(entry, scope):
+            return access_token
+
+        with entry.lock:
+            # another thread may have refreshed the token while we were waiting
+            if access_token := self._get_valid_token(entry, scope):
+                return access_token
+
+            with self._lock:
+                self.misses += 1
+
+            credential = self._get_entry_credential(entry, secret_data)
+            with span("get_token"):
+                access_token = credential.get_token(scope)
+            count(secret_data["tenant_id"], "tokens")
+
+            with self._lock:
+                entry.tokens[scope] = access_token
+
+            _LOGGER.debug(
+                f"[TokenCache] issued new token (tenant_id: {secret_data['tenant_id']}, expires_on: {access_token.expires_on})"
+            )
+
+        return access_token
+
+    def get_credential(self, secret_data: dict) -> "CachedTokenCredential":
+        return CachedTokenCredential(self, secret_data)
+
+    def get_async_credential(self, secret_data: dict) -> "AsyncCachedTokenCredential":
+        return AsyncCachedTokenCredential(self, secret_data)
+
+    def get_client_secret_credential(
+        self, secret_data: dict
+    ) -> "ClientSecretCredential":
+        return self._get_entry_credential(self._get_entry(secret_data), secret_data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_entry(self, secret_data: dict) -> _TokenCacheEntry:
+        return self._entries.get(
+            make_secret_key(secret_data), _TokenCacheEntry, self.conf
+        )
+
+    def _get_entry_credential(
+        self, entry: _TokenCacheEntry, secret_data: dict
+    ) -> "ClientSecretCredential":
+        from azure.identity import ClientSecretCredential
+
+        with self._lock:
+            credential = entry.credential
+
+        if credential is None:
+            azure_cloud_conf = get_azure_cloud_conf()
+            credential = ClientSecretCredential(
+                secret_data["tenant_id"],
+                secret_data["client_id"],
+                secret_data["client_secret"],
+                authority=azure_cloud_conf["authority_host"],
+                disable_instance_discovery=azure_cloud_conf[
+                    "disable_instance_discovery"
+                ],
+                additionally_allowed_tenants=["*"],
+            )
+            with self._lock:
+                if entry.credential is None:
+                    entry.credential = credential
+                credential = entry.credential
+
+        return credential
+
+    def _get_valid_token(self, entry: _TokenCacheEntry, scope: str):
+        with self._lock:
+            access_token = entry.tokens.get(scope)
+            if (
+                access_token
+                and access_token.expires_on - self.conf["refresh_margin"] > time.time()
+            ):
+                self.hits += 1
+                return access_token
+        return None
+
+
+class CachedTokenCredential:
+    """TokenCredential for the SDK clients, answered from a TokenCache.
+
+    The SDK clients and the raw REST calls therefore share one set of tokens
+    and one ClientSecretCredential per (tenant_id, client_id).
+    """
+
+    def __init__(self, cache: TokenCache, secret_data: dict):
+        self._cache = cache
+        self._secret_data = {
+            "tenant_id": secret_data["tenant_id"],
+            "client_id": secret_data["client_id"],
+            "client_secret": secret_data["client_secret"],
+        }
+
+    def get_token(
+        self, *scopes: str, claims: str = None, tenant_id: str = None, **kwargs
+    ) -> AccessToken:
+        secret_data = self._secret_data
+        if tenant_id and tenant_id != secret_data["tenant_id"]:
+            secret_data = {**secret_data, "tenant_id": tenant_id}
+
+        if claims:
+            # a claims challenge can not be answered from the cache
+            credential = self._cache.get_client_secret_credential(secret_data)
+            return credential.get_token(*scopes, claims=claims, **kwargs)
+
+        return self._cache.get_access_token(secret_data, scopes[0])
+
+
+class AsyncCachedTokenCredential:
+    """AsyncTokenCredential for the aio SDK clients, answered from a TokenCache.
+
+    Token refreshes run in a worker thread so that they never block the event loop.
+    """
+
+    def __init__(self, cache: TokenCache, secret_data: dict):
+        self._credential = CachedTokenCredential(cache, secret_data)
+
+    async def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        return await asyncio.to_thread(self._credential.get_token, *scopes, **kwargs)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+token_cache = TokenCache()
@@ -0,0 +1,108 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Union
+
+from spaceone.core import config
+
+from plugin.lib.state_store import SyncStateStore, get_store, make_scope
+
+__all__ = ["SyncCheckpoint", "checkpoint_sync", "checkpoint_scope", "get_checkpoint"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_current_checkpoint = contextvars.ContextVar("sync_checkpoint", default=None)
+
+
+class SyncCheckpoint:
+    """Progress of an unfinished sync, so that the next one resumes from it.
+
+    Each completed unit of work (a listing page with its nextLink cursor, a
+    customer tenant) is written to the store as soon as it is done. Work is
+    recorded in the child checkpoint of its billing account, which is cleared
+    as soon as that billing account is synced, whatever happens to the others.
+    A sync that is interrupted leaves the checkpoints of its unfinished billing
+    accounts behind, and a retry within `max_age` seconds replays the recorded
+    work instead of requesting it again.
+    """
+
+    def __init__(self, store: SyncStateStore, scope: str, max_age: int):
+        self.store = store
+        self.scope = scope
+        self.max_age = max_age
+        self._entries = store.load_checkpoint(scope, time.time() - max_age)
+        self._lock = threading.Lock()
+        self.resumed = 0
+
+        if self._entries:
+            _LOGGER.debug(
+                f"[SyncCheckpoint] resume sync (scope: {scope}, entries: {len(self._entries)})"
+            )
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self.resumed += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+        self.store.save_checkpoint(self.scope, key, value)
+
+    def child(self, name: str) -> "SyncCheckpoint":
+        return SyncCheckpoint(self.store, f"{self.scope}/{name}", self.max_age)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.store.clear_checkpoint(self.scope)
+
+
+@contextmanager
+def checkpoint_sync(
+    domain_id: str, secret_data: dict
+) -> Iterator[Union[SyncCheckpoint, None]]:
+    """Make the checkpoint of the domain and secret current for this context,
+    or yield None if the CHECKPOINT global config is not enabled.
+    """
+    conf = config.get_global("CHECKPOINT")
+    if not conf["enabled"]:
+        yield None
+        return
+
+    store = get_store(conf["path"])
+    # entries older than max_age are never resumed
+    store.prune_checkpoint(time.time() - conf["max_age"])
+
+    checkpoint = SyncCheckpoint(
+        store, make_scope(domain_id, secret_data), conf["max_age"]
+    )
+    token = _current_checkpoint.set(checkpoint)
+    try:
+        yield checkpoint
+    finally:
+        _current_checkpoint.reset(token)
+
+
+@contextmanager
+def checkpoint_scope(name: str) -> Iterator[Union[SyncCheckpoint, None]]:
+    """Make the child checkpoint `name` of the current one current for this
+    context, or yield None if there is no current checkpoint.
+    """
+    if (checkpoint := _current_checkpoint.get()) is None:
+        yield None
+        return
+
+    token = _current_checkpoint.set(checkpoint.child(name))
+    try:
+        yield _current_checkpoint.get()
+    finally:
+        _current_checkpoint.reset(token)
+
+
+def get_checkpoint() -> Union[SyncCheckpoint, None]:
+    return _current_checkpoint.get()
@@ -0,0 +1,84 @@
+import enum
+import threading
+from typing import Any, Iterable, Union
+
+__all__ = ["ModelConverter", "model_converter"]
+
+_SCALAR_TYPES = (str, int, float, bool, bytes)
+_IN_PROGRESS = object()
+
+
+class ModelConverter:
+    """Converts Azure SDK models (and nested dicts/lists of them) into plain dicts.
+
+    The attribute names read from each model type are computed once and cached
+    per type. SDK objects are never modified: new dicts and lists are built
+    instead. An object shared by several parents is converted only once per
+    call, and an object that refers back to one of its parents is converted to
+    None instead of recursing forever.
+    """
+
+    def __init__(self):
+        self._field_plans = {}
+        self._lock = threading.Lock()
+
+    def convert(self, value: Any, fields: Iterable[str] = None) -> Any:
+        """Convert value; `fields` limits the top-level keys that are extracted."""
+        if fields is not None:
+            fields = tuple(fields)
+        return self._convert(value, fields, {})
+
+    def _convert(self, value: Any, fields: Union[tuple, None], memo: dict) -> Any:
+        if value is None or isinstance(value, _SCALAR_TYPES):
+            if isinstance(value, enum.Enum):
+                return value.value
+            return value
+
+        if isinstance(value, (list, tuple, set)):
+            return [self._convert(item, None, memo) for item in value]
+
+        if isinstance(value, dict):
+            if fields is not None:
+                items = ((key, value[key]) for key in fields if key in value)
+            else:
+                items = value.items()
+        elif hasattr(value, "__dict__") and not isinstance(value, enum.Enum):
+            attribute_names = fields or self._get_field_plan(value)
+            items = ((name, getattr(value, name, None)) for name in attribute_names)
+        elif isinstance(value, enum.Enum):
+            return value.value
+        else:
+            # datetime, Decimal and other leaf values are kept as they are
+            return value
+
+        value_id = id(value)
+        if value_id in memo:
+            converted = memo[value_id]
+            return None if converted is _IN_PROGRESS else converted
+
+        memo[value_id] = _IN_PROGRESS
+        converted = {key: self._convert(item, None, memo) for key, item in items}
+        memo[value_id] = converted
+        return converted
+
+    def _get_field_plan(self, value: Any) -> tuple:
+        value_type = type(value)
+        if (field_plan := self._field_plans.get(value_type)) is not None:
+            return field_plan
+
+        attribute_map = getattr(value_type, "_attribute_map", None)
+        if not isinstance(attribute_map, dict):
+            # plain objects may carry per-instance attributes, so they are not cached
+            return tuple(vars(value))
+
+        field_plan = tuple(attribute_map)
+        if "additional_properties" in vars(value):
+            field_plan += ("additional_properties",)
+
+        with self._lock:
+            self._field_plans[value_type] = field_plan
+
+        return field_plan
+
+
+model_converter = ModelConverter()
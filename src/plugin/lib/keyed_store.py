@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List
+
+__all__ = ["KeyedStore", "make_secret_key"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class KeyedStore:
+    """Thread-safe map of values created on first use.
+
+    Values that have not been used for `idle_timeout` seconds, or the least
+    recently used ones beyond `max_size`, are dropped. Both limits are read from
+    the conf given on every call, so owners keep reading their own global
+    config. Keys are tuples starting with the tenant id, which evictions log.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any], conf: dict) -> Any:
+        """Return the value of key, created with factory if it is missing."""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now - conf["idle_timeout"])
+
+            if (entry := self._entries.get(key)) is None:
+                value = factory()
+            else:
+                _, value = entry
+
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            self._evict_overflow(conf["max_size"])
+
+        return value
+
+    def keys(self) -> List[Hashable]:
+        """Keys from the least to the most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict_idle(self, expired_at: float) -> None:
+        while self._entries:
+            key, (last_used, _) = next(iter(self._entries.items()))
+            if last_used > expired_at:
+                break
+            self._entries.popitem(last=False)
+            _LOGGER.debug(f"[{self.name}] evict idle entry (tenant_id: {key[0]})")
+
+    def _evict_overflow(self, max_size: int) -> None:
+        while len(self._entries) > max_size:
+            key, _ = self._entries.popitem(last=False)
+            _LOGGER.debug(f"[{self.name}] evict entry (tenant_id: {key[0]})")
+
+
+def make_secret_key(secret_data: dict, *fields: str) -> tuple:
+    """Key of the tenant, client and the given fields of secret_data.
+
+    The client secret is part of the key, hashed, so that a different secret
+    never shares a cached credential.
+    """
+    secret_hash = hashlib.sha256(
+        secret_data["client_secret"].encode("utf-8")
+    ).hexdigest()
+    return (
+        secret_data["tenant_id"],
+        secret_data["client_id"],
+        *(secret_data.get(field, "") for field in fields),
+        secret_hash,
+    )
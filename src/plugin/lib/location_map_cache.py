@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Union
+
+from spaceone.core import config
+
+__all__ = ["LocationMapCache", "location_map_cache"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class LocationMapCache:
+    """Process-wide cache of the per-tenant subscription -> location maps.
+
+    Entries expire after `ttl` seconds and the least recently used ones beyond
+    `max_size` are evicted. When `path` is set, the cache is also written to
+    that JSON file and loaded from it on first use, so that it survives plugin
+    restarts. A `ttl` of 0 disables the cache.
+    """
+
+    def __init__(self, conf: dict = None):
+        self._conf = conf
+        self._entries = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conf(self) -> dict:
+        if self._conf is None:
+            self._conf = config.get_global("MANAGEMENT_GROUP_CACHE")
+        return self._conf
+
+    @property
+    def enabled(self) -> bool:
+        return self.conf["ttl"] > 0
+
+    def get(self, key: str) -> Union[dict, None]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entries = self._get_entries()
+            expires_at, location_map = entries.get(key, (0, None))
+
+            if location_map is not None and expires_at > time.time():
+                entries.move_to_end(key)
+                self.hits += 1
+                return location_map
+
+            entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, location_map: dict) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            entries = self._get_entries()
+            entries[key] = (time.time() + self.conf["ttl"], location_map)
+            entries.move_to_end(key)
+
+            while len(entries) > self.conf["max_size"]:
+                evicted_key, _ = entries.popitem(last=False)
+                _LOGGER.debug(f"[LocationMapCache] evict location map ({evicted_key})")
+
+            self._save(entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+            self._save(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries or {}),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    @staticmethod
+    def make_key(secret_data: dict, tenant_id: str, options: dict) -> str:
+        # locations depend on what the secret can see and on the location options
+        return ":".join(
+            [
+                tenant_id,
+                secret_data.get("client_id", ""),
+                str(bool(options.get("exclude_root_management_group"))),
+            ]
+        )
+
+    def _get_entries(self) -> OrderedDict:
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> OrderedDict:
+        entries = OrderedDict()
+        if not (path := self.conf["path"]) or not os.path.exists(path):
+            return entries
+
+        try:
+            with open(path, "r") as f:
+                now = time.time()
+                for key, expires_at, location_map in json.load(f):
+                    if expires_at > now:
+                        entries[key] = (expires_at, location_map)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"[LocationMapCache] failed to load {path}: {e}")
+
+        return entries
+
+    def _save(self, entries: OrderedDict) -> None:
+        if not (path := self.conf["path"]):
+            return
+
+        try:
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, delete=False, suffix=".tmp"
+            ) as f:
+                json.dump(
+                    [
+                        [key, expires_at, location_map]
+                        for key, (expires_at, location_map) in entries.items()
+                    ],
+                    f,
+                )
+            os.replace(f.name, path)
+        except OSError as e:
+            _LOGGER.warning(f"[LocationMapCache] failed to save {path}: {e}")
+
+
+location_map_cache = LocationMapCache()
@@ -0,0 +1,82 @@
+from typing import Dict, List, Tuple, Union
+
+__all__ = ["ManagementGroupNode", "ManagementGroupTree"]
+
+
+class ManagementGroupNode:
+    """One management group, pointing at its parent group."""
+
+    __slots__ = ("resource_id", "name", "parent", "_location")
+
+    def __init__(
+        self, resource_id: str, name: str, parent: "ManagementGroupNode" = None
+    ):
+        self.resource_id = resource_id
+        self.name = name
+        self.parent = parent
+        self._location = None
+
+    def get_location(self, exclude_root: bool = False) -> Tuple[dict, ...]:
+        """Location entries from the root group down to this group.
+
+        The tuple is built once per node and shared by every subscription under
+        it, and each parent's tuple is reused as its prefix.
+        """
+        if self._location is None:
+            location = self.parent.get_location(exclude_root) if self.parent else ()
+            if not (exclude_root and self.parent is None):
+                location += ({"name": self.name, "resource_id": self.resource_id},)
+            self._location = location
+        return self._location
+
+
+class ManagementGroupTree:
+    """Interned management group hierarchy of one tenant.
+
+    Every management group is stored once, and subscriptions only refer to their
+    direct parent group, so large tenants do not hold one copy of the ancestor
+    chain per subscription.
+    """
+
+    def __init__(self, exclude_root: bool = False):
+        self.exclude_root = exclude_root
+        self._nodes: Dict[str, ManagementGroupNode] = {}
+        self._subscriptions: Dict[str, Union[ManagementGroupNode, None]] = {}
+
+    def add_subscription(
+        self,
+        subscription_id: str,
+        parent_name_chain: List[str],
+        parent_display_name_chain: List[str],
+    ) -> None:
+        self._subscriptions[subscription_id] = self._intern_chain(
+            parent_name_chain, parent_display_name_chain
+        )
+
+    def get_location(self, subscription_id: str) -> Union[Tuple[dict, ...], None]:
+        if subscription_id not in self._subscriptions:
+            return None
+        if (node := self._subscriptions[subscription_id]) is None:
+            return ()
+        return node.get_location(self.exclude_root)
+
+    def to_location_map(self) -> Dict[str, Tuple[dict, ...]]:
+        return {
+            subscription_id: self.get_location(subscription_id)
+            for subscription_id in self._subscriptions
+        }
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _intern_chain(
+        self, parent_name_chain: List[str], parent_display_name_chain: List[str]
+    ) -> Union[ManagementGroupNode, None]:
+        node = parent = None
+        for resource_id, name in zip(parent_name_chain, parent_display_name_chain):
+            if (node := self._nodes.get(resource_id)) is None:
+                node = self._nodes[resource_id] = ManagementGroupNode(
+                    resource_id, name.strip(), parent
+                )
+            parent = node
+        return node
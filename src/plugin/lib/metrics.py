@@ -0,0 +1,92 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+__all__ = ["SyncMetrics", "collect_metrics", "get_metrics", "span", "count"]
+
+_current_metrics = contextvars.ContextVar("sync_metrics", default=None)
+
+
+class SyncMetrics:
+    """Timings of the sync phases and API call counters per tenant.
+
+    Spans with the same name are aggregated into a call count and a total time,
+    so wrapping a hot function does not grow the summary.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            calls, total = self._spans.get(name, (0, 0.0))
+            self._spans[name] = (calls + 1, total + elapsed)
+
+    def incr(self, tenant_id: str, name: str, value: int = 1) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(tenant_id, {})
+            counters[name] = counters.get(name, 0) + value
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "elapsed": round(time.perf_counter() - self.started_at, 3),
+                "spans": {
+                    name: {"calls": calls, "total": round(total, 3)}
+                    for name, (calls, total) in sorted(
+                        self._spans.items(), key=lambda item: -item[1][1]
+                    )
+                },
+                "tenants": {
+                    tenant_id: dict(counters)
+                    for tenant_id, counters in self._counters.items()
+                },
+            }
+
+
+@contextmanager
+def collect_metrics() -> Iterator[SyncMetrics]:
+    """Collect the metrics of everything run in this context.
+
+    Threads started by AzureBaseManager.run_concurrently and asyncio tasks
+    inherit the context, so their spans and counters are collected too. When
+    metrics are already collected, e.g. by a benchmark that wraps the sync,
+    the enclosing SyncMetrics is used.
+    """
+    if (metrics := _current_metrics.get()) is not None:
+        yield metrics
+        return
+
+    metrics = SyncMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def get_metrics() -> Union[SyncMetrics, None]:
+    return _current_metrics.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if (metrics := _current_metrics.get()) is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - started_at)
+
+
+def count(tenant_id: str, name: str, value: int = 1) -> None:
+    if (metrics := _current_metrics.get()) is not None:
+        metrics.incr(tenant_id, name, value)
@@ -0,0 +1,32 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+__all__ = ["loads", "project"]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON payload, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def project(value: Any, projection: Union[dict, None]) -> Any:
+    """Keep only the keys of projection, recursively.
+
+    projection maps each key to keep to the projection of its value, or to None
+    to keep the value as it is. Keys missing from value are left out.
+    """
+    if projection is None or not isinstance(value, dict):
+        return value
+
+    return {
+        key: project(value[key], sub_projection)
+        for key, sub_projection in projection.items()
+        if key in value
+    }
@@ -0,0 +1,74 @@
+import threading
+from typing import List
+
+__all__ = ["ResultStore", "AGREEMENT_TYPE_PRECEDENCE"]
+
+# Billing agreements know more about a subscription (department, enrollment
+# account, customer) than the plain subscription listing does.
+AGREEMENT_TYPE_PRECEDENCE = {
+    "EnterpriseAgreement": 0,
+    "MicrosoftPartnerAgreement": 1,
+    "Unknown": 2,
+}
+
+
+class ResultStore:
+    """Account results of one sync, one per subscription.
+
+    Results are keyed by the lowercase subscription id. When the same
+    subscription comes from several billing accounts, the result with the
+    highest precedence provides the name and data. It also provides the
+    location, unless its location is empty. Tags are merged, and on conflicting
+    keys the higher precedence wins. Secrets are kept from whichever result
+    has them.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, result: dict, agreement_type: str = None) -> None:
+        key = result["resource_id"].lower()
+        precedence = AGREEMENT_TYPE_PRECEDENCE.get(
+            agreement_type, len(AGREEMENT_TYPE_PRECEDENCE)
+        )
+
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                self._entries[key] = (precedence, result)
+                return
+
+            current_precedence, current = entry
+            if precedence < current_precedence:
+                self._entries[key] = (precedence, self._merge(result, current))
+            else:
+                self._entries[key] = (current_precedence, self._merge(current, result))
+
+    def extend(self, results: List[dict], agreement_type: str = None) -> None:
+        for result in results:
+            self.add(result, agreement_type)
+
+    def results(self) -> List[dict]:
+        with self._lock:
+            return [result for _, result in self._entries.values()]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _merge(primary: dict, secondary: dict) -> dict:
+        if primary is secondary:
+            return primary
+
+        merged = dict(primary)
+        if not merged.get("location") and secondary.get("location"):
+            merged["location"] = secondary["location"]
+
+        if secondary.get("tags"):
+            merged["tags"] = {**secondary["tags"], **(primary.get("tags") or {})}
+
+        if "secret_data" not in merged and "secret_data" in secondary:
+            merged["secret_schema_id"] = secondary["secret_schema_id"]
+            merged["secret_data"] = secondary["secret_data"]
+
+        return merged
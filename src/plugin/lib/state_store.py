@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Tuple, Union
+
+from spaceone.core import config
+
+__all__ = [
+    "SyncStateStore",
+    "SyncState",
+    "make_fingerprint",
+    "make_scope",
+    "get_sync_state",
+    "get_store",
+]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class SyncStateStore:
+    """SQLite snapshot of the account results made by previous syncs.
+
+    Rows are grouped by scope (one per domain and secret) and hold, for every
+    group of subscriptions collected together, the fingerprint of the billing
+    values the group was collected from and its results. The checkpoints of
+    unfinished syncs are kept in the same database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+        self._lock = threading.Lock()
+        # separate from _lock, which writers hold while they connect
+        self._init_lock = threading.Lock()
+
+    def load(self, scope: str) -> Dict[str, Tuple[str, Dict[str, dict], float]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT group_key, fingerprint, results, synced_at FROM group_state WHERE scope = ?",
+                (scope,),
+            ).fetchall()
+
+        return {
+            group_key: (fingerprint, json.loads(results), synced_at)
+            for group_key, fingerprint, results, synced_at in rows
+        }
+
+    def save(
+        self, scope: str, changed: Dict[str, Tuple[str, Dict[str, dict]]], removed: set
+    ) -> None:
+        synced_at = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO group_state VALUES (?, ?, ?, ?, ?)",
+                [
+                    (scope, group_key, fingerprint, json.dumps(results), synced_at)
+                    for group_key, (fingerprint, results) in changed.items()
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM group_state WHERE scope = ? AND group_key = ?",
+                [(scope, group_key) for group_key in removed],
+            )
+
+    def load_checkpoint(self, scope: str, since: float) -> Dict[str, Any]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM checkpoint WHERE scope = ? AND updated_at >= ?",
+                (scope, since),
+            ).fetchall()
+
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_checkpoint(self, scope: str, key: str, value: Any) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoint VALUES (?, ?, ?, ?)",
+                (scope, key, json.dumps(value, default=str), time.time()),
+            )
+
+    def clear_checkpoint(self, scope: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM checkpoint WHERE scope = ?", (scope,))
+
+    def prune_checkpoint(self, before: float) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM checkpoint WHERE updated_at < ?", (before,))
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._initialize()
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _initialize(self) -> None:
+        if directory := os.path.dirname(self.path):
+            os.makedirs(directory, exist_ok=True)
+
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS group_state ("
+                "scope TEXT NOT NULL, "
+                "group_key TEXT NOT NULL, "
+                "fingerprint TEXT NOT NULL, "
+                "results TEXT NOT NULL, "
+                "synced_at REAL NOT NULL, "
+                "PRIMARY KEY (scope, group_key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint ("
+                "scope TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "updated_at REAL NOT NULL, "
+                "PRIMARY KEY (scope, key))"
+            )
+        self._initialized = True
+
+
+class SyncState:
+    """Change detection for one sync, backed by the state of the previous one.
+
+    Managers collect subscriptions in groups (a customer tenant, an EA
+    department) and fingerprint what the listings return for a group, together
+    with the tags and the cached management group locations of its
+    subscriptions. When the fingerprint is unchanged and the group was collected
+    less than `max_age` seconds ago, its stored results are reused and the
+    per-group requests are skipped. Changes the fingerprint cannot see, such as
+    the access of the secret to a customer subscription, show up within
+    `max_age`. `commit` persists the collected groups and drops the groups that
+    were not seen again.
+    """
+
+    def __init__(self, store: SyncStateStore, scope: str, max_age: int):
+        self.store = store
+        self.scope = scope
+        self.max_age = max_age
+        self._previous = store.load(scope)
+        self._changed = {}
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def get_results(
+        self, group_key: str, fingerprint: str
+    ) -> Union[Dict[str, dict], None]:
+        """Return the stored results of the group by subscription id, or None
+        if the group has to be collected again.
+        """
+        with self._lock:
+            self._seen.add(group_key)
+            previous_fingerprint, results, synced_at = self._previous.get(
+                group_key, (None, None, 0)
+            )
+
+        if previous_fingerprint != fingerprint:
+            return None
+        if synced_at < time.time() - self.max_age:
+            return None
+        return results
+
+    def set_results(
+        self, group_key: str, fingerprint: str, results: Dict[str, dict]
+    ) -> None:
+        """Store the results of a group that was collected completely."""
+        with self._lock:
+            self._seen.add(group_key)
+            self._changed[group_key] = (fingerprint, results)
+
+    def commit(self, remove_missing: bool = True) -> None:
+        with self._lock:
+            removed = set(self._previous) - self._seen if remove_missing else set()
+            self.store.save(self.scope, self._changed, removed)
+
+            _LOGGER.debug(
+                f"[SyncState] scope: {self.scope}, collected: {len(self._changed)}, "
+                f"reused: {len(self._seen) - len(self._changed)}, removed: {len(removed)}"
+            )
+
+
+def make_fingerprint(*values: Any) -> str:
+    payload = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_sync_state(domain_id: str, secret_data: dict) -> Union[SyncState, None]:
+    """Return the SyncState of the domain and secret, or None if the
+    INCREMENTAL_SYNC global config is not enabled.
+    """
+    conf = config.get_global("INCREMENTAL_SYNC")
+    if not conf["enabled"]:
+        return None
+
+    return SyncState(
+        get_store(conf["path"]), make_scope(domain_id, secret_data), conf["max_age"]
+    )
+
+
+def make_scope(domain_id: str, secret_data: dict) -> str:
+    return make_fingerprint(
+        domain_id, secret_data.get("tenant_id"), secret_data.get("client_id")
+    )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str) -> SyncStateStore:
+    with _stores_lock:
+        if (store := _stores.get(path)) is None:
+            store = _stores[path] = SyncStateStore(path)
+        return store
@@ -1,9 +1,18 @@
+import asyncio
 import logging
+from typing import TYPE_CHECKING, List, Union
 
+from spaceone.core import config
 from spaceone.identity.plugin.account_collector.lib.server import (
     AccountCollectorPluginServer,
 )
-from plugin.manager.base import AzureBaseManager
+from plugin.lib.checkpoint import checkpoint_scope, checkpoint_sync
+from plugin.lib.metrics import collect_metrics, span
+from plugin.lib.result_store import ResultStore
+from plugin.lib.state_store import SyncState, get_sync_state
+
+if TYPE_CHECKING:
+    from plugin.manager.base import AzureBaseManager
 
 _LOGGER = logging.getLogger("spaceone")
 
@@ -97,41 +106,112 @@ def account_collector_sync(params: dict) -> dict:
     options = params["options"]
     domain_id = params["domain_id"]
 
-    results = []
-    billing_accounts = AzureBaseManager.list_billing_accounts(secret_data)
+    with collect_metrics() as metrics, checkpoint_sync(domain_id, secret_data):
+        results = _sync_billing_accounts(options, secret_data, domain_id, schema_id)
 
-    for billing_account in billing_accounts:
-        agreement_type = _get_agreement_type(billing_account)
-        billing_account_id = billing_account.name or None
+    _LOGGER.info(
+        f"[account_collector_sync] tenant_id: {secret_data.get('tenant_id')}, results: {len(results)}, metrics: {metrics.summary()}"
+    )
 
-        account_collector_manager = AzureBaseManager.get_manager_by_agreement_type(
-            agreement_type
-        )
-        ac_mgr = account_collector_manager()
-        results.extend(
-            ac_mgr.sync(
-                options=options,
-                secret_data=secret_data,
-                domain_id=domain_id,
-                billing_account_id=billing_account_id,
-                schema_id=schema_id,
-            )
-        )
+    return {"results": results}
+
+
+def _sync_billing_accounts(
+    options: dict, secret_data: dict, domain_id: str, schema_id: str = None
+) -> list:
+    # the managers and the Azure SDKs are only needed by sync, not by init
+    from plugin.manager.base import AzureBaseManager
+
+    sync_state = get_sync_state(domain_id, secret_data)
+
+    with span("list_billing_accounts"):
+        billing_accounts = list(AzureBaseManager.list_billing_accounts(secret_data))
+
+    sync_params = {
+        "options": options,
+        "secret_data": secret_data,
+        "domain_id": domain_id,
+        "schema_id": schema_id,
+    }
+
+    result_store = ResultStore()
+    errors = []
     if not billing_accounts:
         account_collector_manager = AzureBaseManager.get_manager_by_agreement_type(
             "Unknown"
         )
-        ac_mgr = account_collector_manager()
-        results.extend(
-            ac_mgr.sync(
-                options=options,
-                secret_data=secret_data,
-                domain_id=domain_id,
-                schema_id=schema_id,
-            )
+        ac_mgr = account_collector_manager(sync_state=sync_state)
+        result_store.extend(_run_manager_sync(ac_mgr, **sync_params), "Unknown")
+    else:
+        # Billing accounts are synced concurrently and their results are merged
+        # into one result per subscription, in billing account order. A failed
+        # billing account does not drop the results of the others.
+        billing_account_syncs = AzureBaseManager.run_concurrently(
+            lambda _billing_account: _sync_billing_account(
+                _billing_account, sync_state, **sync_params
+            ),
+            billing_accounts,
+            AzureBaseManager.get_concurrency("billing_accounts"),
         )
-
-    return {"results": results}
+        for billing_account, billing_account_results, error in billing_account_syncs:
+            if error:
+                _LOGGER.error(
+                    f"[account_collector_sync] failed to sync billing account {billing_account.name}: {error}",
+                    exc_info=error,
+                )
+                errors.append(error)
+                continue
+
+            result_store.extend(
+                billing_account_results, _get_agreement_type(billing_account)
+            )
+            # the store keeps the results, the list of the account is not needed
+            # while the next billing account is awaited
+            del billing_account_results
+
+        if errors and len(errors) == len(billing_accounts):
+            raise errors[0]
+
+    if sync_state:
+        # subscriptions of a failed billing account must not be dropped
+        sync_state.commit(remove_missing=not errors)
+
+    return result_store.results()
+
+
+def _sync_billing_account(
+    billing_account, sync_state: Union[SyncState, None], **sync_params
+) -> List[dict]:
+    from plugin.manager.base import AzureBaseManager
+
+    agreement_type = _get_agreement_type(billing_account)
+    billing_account_id = billing_account.name or None
+
+    account_collector_manager = AzureBaseManager.get_manager_by_agreement_type(
+        agreement_type
+    )
+    ac_mgr = account_collector_manager(sync_state=sync_state)
+    return _run_manager_sync(
+        ac_mgr, billing_account_id=billing_account_id, **sync_params
+    )
+
+
+def _run_manager_sync(ac_mgr: "AzureBaseManager", **kwargs) -> List[dict]:
+    # The results of the billing account are collected into this one list, so
+    # that a failed billing account adds none of them to the ResultStore. The
+    # caller merges the list into the store and drops it.
+    # Each billing account keeps its own checkpoint, cleared once it is synced.
+    checkpoint_name = kwargs.get("billing_account_id") or ac_mgr.agreement_type
+    with checkpoint_scope(checkpoint_name) as checkpoint:
+        with span(f"sync.{ac_mgr.agreement_type}"):
+            if config.get_global("ASYNC_SYNC"):
+                results = asyncio.run(ac_mgr.sync_async(**kwargs))
+            else:
+                results = list(ac_mgr.sync(**kwargs))
+
+    if checkpoint:
+        checkpoint.clear()
+    return results
 
 
 def _get_agreement_type(billing_account) -> str:
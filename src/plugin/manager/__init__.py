@@ -1,3 +1,17 @@
-from plugin.manager.mpa_manager import MPAManager
-from plugin.manager.ea_manager import EAManager
-from plugin.manager.resource_manager import ResourceManager
+import importlib
+
+# The agreement managers pull in the Azure SDKs, so they are imported on first
+# access instead of with the package.
+_MANAGER_MODULES = {
+    "MPAManager": "plugin.manager.mpa_manager",
+    "EAManager": "plugin.manager.ea_manager",
+    "ResourceManager": "plugin.manager.resource_manager",
+}
+
+__all__ = list(_MANAGER_MODULES)
+
+
+def __getattr__(name: str):
+    if name in _MANAGER_MODULES:
+        return getattr(importlib.import_module(_MANAGER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,22 +1,35 @@
+import asyncio
+import contextvars
 import logging
-from typing import Union, List
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Tuple, Union
 
+from spaceone.core import config
 from spaceone.core.manager import BaseManager
 
 from plugin.connector.billing_connector import BillingConnector
+from plugin.lib.converter import model_converter
+from plugin.lib.state_store import SyncState
 
 _LOGGER = logging.getLogger("spaceone")
 
+_DONE = object()
+
 
 class AzureBaseManager(BaseManager):
     provider = "azure"
     agreement_type = None
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, sync_state: SyncState = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.sync_state = sync_state
+
+    def sync(self, *args, **kwargs) -> Iterator[dict]:
+        """Yields account results as soon as they are made
 
-    def sync(self, *args, **kwargs) -> list:
-        """
         Args:
             options: dict,
             secret_data: dict,
@@ -28,35 +41,25 @@ class AzureBaseManager(BaseManager):
         """
         raise NotImplementedError("Method not implemented!")
 
-    def convert_nested_dictionary(self, cloud_svc_object):
-        cloud_svc_dict = {}
-        if hasattr(
-            cloud_svc_object, "__dict__"
-        ):  # if cloud_svc_object is not a dictionary type but has dict method
-            cloud_svc_dict = cloud_svc_object.__dict__
-        elif isinstance(cloud_svc_object, dict):
-            cloud_svc_dict = cloud_svc_object
-        elif not isinstance(
-            cloud_svc_object, list
-        ):  # if cloud_svc_object is one of type like int, float, char, ...
-            return cloud_svc_object
-
-        # if cloud_svc_object is dictionary type
-        for key, value in cloud_svc_dict.items():
-            if hasattr(value, "__dict__") or isinstance(value, dict):
-                cloud_svc_dict[key] = self.convert_nested_dictionary(value)
-            if "azure" in str(type(value)):
-                cloud_svc_dict[key] = self.convert_nested_dictionary(value)
-            elif isinstance(value, list):
-                value_list = []
-                for v in value:
-                    value_list.append(self.convert_nested_dictionary(v))
-                cloud_svc_dict[key] = value_list
-
-        return cloud_svc_dict
+    async def sync_async(self, *args, **kwargs) -> List[dict]:
+        """Async variant of sync, taking the same arguments
+
+        Managers without a native async path run sync in a worker thread.
+        """
+        return await asyncio.to_thread(lambda: list(self.sync(*args, **kwargs)))
+
+    @staticmethod
+    def convert_nested_dictionary(cloud_svc_object, fields: Iterable[str] = None):
+        """Convert an SDK model into a new plain dict without modifying it.
+
+        If fields is given, only those top-level fields are extracted.
+        It runs once per subscription, so it is timed by the enclosing phases
+        rather than by a span of its own.
+        """
+        return model_converter.convert(cloud_svc_object, fields)
 
     @staticmethod
-    def list_billing_accounts(secret_data: dict) -> list:
+    def list_billing_accounts(secret_data: dict) -> Iterator:
         billing_connector = BillingConnector(secret_data=secret_data)
         return billing_connector.list_billing_accounts(secret_data=secret_data)
 
@@ -125,12 +128,139 @@ class AzureBaseManager(BaseManager):
             )
         return result
 
+    @staticmethod
+    def get_concurrency(name: str) -> int:
+        return config.get_global("CONCURRENCY")[name]
+
+    @staticmethod
+    def run_concurrently(
+        func: Callable, items: list, max_workers: int
+    ) -> Iterator[Tuple[Any, Any, Union[Exception, None]]]:
+        """Run func(item) for every item with at most max_workers threads.
+
+        Yields (item, result, error) tuples in the order of items, each one as soon
+        as it and all items before it are done. An exception raised for one item is
+        yielded as its error instead of aborting the rest. A result is not kept
+        once it is yielded, so the caller can release it before the next one.
+        """
+        if max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                try:
+                    result = func(item)
+                except Exception as e:
+                    yield item, None, e
+                else:
+                    yield item, result, None
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            # each worker runs in a copy of the caller's context, so that its
+            # metrics are collected into the same sync
+            futures = deque(
+                (item, executor.submit(contextvars.copy_context().run, func, item))
+                for item in items
+            )
+            while futures:
+                item, future = futures.popleft()
+                if (error := future.exception()) is not None:
+                    yield item, None, error
+                else:
+                    yield item, future.result(), None
+
+    @staticmethod
+    def stream_concurrently(
+        func: Callable, items: list, max_workers: int, max_buffered: int = 1000
+    ) -> Iterator[Tuple[Any, Iterator]]:
+        """Run the generator func(item) for every item with at most max_workers
+        items in flight.
+
+        Yields (item, values) tuples in the order of items. values iterates over
+        what func(item) yields as soon as it is produced, and raises the exception
+        of func(item) when it gets there. Each worker runs at most max_buffered
+        values ahead of the consumer and the next item is started only when one
+        is consumed, so memory does not grow with the number of items. Values left
+        unconsumed when the next tuple is requested are drained and dropped.
+        """
+        if max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                yield item, func(item)
+            return
+
+        cancelled = threading.Event()
+
+        def put(buffer: queue.Queue, entry: tuple) -> bool:
+            while not cancelled.is_set():
+                try:
+                    buffer.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(item: Any, buffer: queue.Queue) -> None:
+            try:
+                for value in func(item):
+                    if not put(buffer, (value, None)):
+                        return
+            except Exception as e:
+                put(buffer, (_DONE, e))
+            else:
+                put(buffer, (_DONE, None))
+
+        def consume(buffer: queue.Queue) -> Iterator:
+            while True:
+                value, error = buffer.get()
+                if value is _DONE:
+                    if error:
+                        raise error
+                    return
+                yield value
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            remaining = iter(items)
+            in_flight = deque()
+
+            def submit_next() -> None:
+                for item in remaining:
+                    buffer = queue.Queue(maxsize=max_buffered)
+                    # see run_concurrently for why the context is copied
+                    executor.submit(
+                        contextvars.copy_context().run, produce, item, buffer
+                    )
+                    in_flight.append((item, buffer))
+                    return
+
+            try:
+                for _ in range(max_workers):
+                    submit_next()
+
+                while in_flight:
+                    item, buffer = in_flight.popleft()
+                    values = consume(buffer)
+                    yield item, values
+                    for _ in values:
+                        pass
+                    submit_next()
+            finally:
+                # unblocks the workers when the consumer stops early
+                cancelled.set()
+
     @classmethod
     def get_all_managers(cls, options) -> list:
+        cls._import_managers()
         return cls.__subclasses__()
 
     @classmethod
     def get_manager_by_agreement_type(cls, agreement_type: str):
+        cls._import_managers()
         for subclass in cls.__subclasses__():
             if subclass.agreement_type == agreement_type:
                 return subclass
+
+    @staticmethod
+    def _import_managers() -> None:
+        # managers register themselves as subclasses when their module is imported
+        import plugin.manager
+
+        for manager_name in plugin.manager.__all__:
+            getattr(plugin.manager, manager_name)
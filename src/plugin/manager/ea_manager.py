@@ -1,8 +1,10 @@
 import logging
-from typing import List
+from typing import Iterator, List
 
 from plugin.connector.billing_connector import BillingConnector
 from plugin.connector.subscription_connector import SubscriptionConnector
+from plugin.lib.metrics import span
+from plugin.lib.state_store import make_fingerprint
 from plugin.manager.base import AzureBaseManager
 from plugin.manager.management_group_manger import ManagementGroupManager
 
@@ -11,6 +13,21 @@ _LOGGER = logging.getLogger("spaceone")
 
 class EAManager(AzureBaseManager):
     agreement_type = "EnterpriseAgreement"
+    billing_subscription_fields = ("properties",)
+    subscription_fields = ("tags",)
+    # only these parts of the billing REST payloads are kept
+    department_projection = {"name": None, "properties": {"departmentName": None}}
+    billing_subscription_projection = {
+        "properties": {
+            "subscriptionId": None,
+            "displayName": None,
+            "enrollmentAccountId": None,
+            "enrollmentAccountDisplayName": None,
+            "enrollmentAccountSubscriptionDetails": {
+                "subscriptionEnrollmentAccountStatus": None
+            },
+        }
+    }
 
     def __init__(self, *args, **kwargs):
         self.management_group_mgr = ManagementGroupManager()
@@ -23,29 +40,71 @@ class EAManager(AzureBaseManager):
         domain_id: str,
         billing_account_id: str,
         schema_id: str = None,
-    ) -> List[dict]:
-        results = []
-
+    ) -> Iterator[dict]:
         billing_connector = BillingConnector(secret_data)
         subscription_connector = SubscriptionConnector(secret_data)
 
-        management_group_location_map = {}
+        location_maps = {}
+        subscription_index = None
         tenant_id = secret_data["tenant_id"]
 
         _LOGGER.debug(
             f"[sync] Start sync for tenant_id: {tenant_id}, agreement_type: {self.agreement_type}"
         )
 
-        for department in billing_connector.list_departments(
-            secret_data, billing_account_id
+        with span("list_departments"):
+            departments = list(
+                billing_connector.list_departments(
+                    secret_data, billing_account_id, self.department_projection
+                )
+            )
+
+        # Departments are independent, so their subscriptions are paged concurrently
+        # and streamed back in department order
+        for department, department_subscriptions in self.stream_concurrently(
+            lambda _department: self._list_department_subscriptions(
+                billing_connector, options, secret_data, _department, billing_account_id
+            ),
+            departments,
+            self.get_concurrency("departments"),
         ):
             department_id = department["name"]
             department_name = department.get("properties", {}).get("departmentName")
 
-            for subscription in billing_connector.list_subscription_by_department(
-                options, secret_data, department_id, billing_account_id
-            ):
-                subscription_info = self.convert_nested_dictionary(subscription)
+            # An unchanged department reuses its stored results, so that its
+            # subscriptions are not converted and looked up again. The tags and
+            # management group locations are part of the fingerprint, since the
+            # billing listing does not carry them (incremental sync only).
+            if self.sync_state is not None:
+                # the whole department is needed to fingerprint it
+                department_subscriptions = list(department_subscriptions)
+                location_map, _ = self.management_group_mgr.get_location_map_once(
+                    options, secret_data, tenant_id, location_maps
+                )
+                if subscription_index is None:
+                    subscription_index = self._get_subscription_index(
+                        subscription_connector
+                    )
+
+                group_key = f"{billing_account_id}/department:{department_id}"
+                fingerprint = make_fingerprint(
+                    options,
+                    department,
+                    department_subscriptions,
+                    self._get_subscription_details(
+                        department_subscriptions, subscription_index, location_map
+                    ),
+                )
+                results = self.sync_state.get_results(group_key, fingerprint)
+                if results is not None:
+                    yield from results.values()
+                    continue
+
+            department_results = {}
+            for subscription in department_subscriptions:
+                subscription_info = self.convert_nested_dictionary(
+                    subscription, self.billing_subscription_fields
+                )
                 subscription_status = self.get_subscription_status(
                     subscription_info, self.agreement_type
                 )
@@ -71,27 +130,24 @@ class EAManager(AzureBaseManager):
                         )
 
                     # Check Management Group Location
-                    if tenant_id not in management_group_location_map.keys():
-                        management_group_location_map = (
-                            self.management_group_mgr.get_management_group_location_map(
-                                options,
-                                secret_data,
-                                tenant_id,
-                                management_group_location_map,
-                            )
-                        )
-
-                    if management_group_location_map.get(tenant_id):
-                        management_group_location = management_group_location_map[
-                            tenant_id
-                        ].get(subscription_id, [])
+                    location_map, _ = self.management_group_mgr.get_location_map_once(
+                        options, secret_data, tenant_id, location_maps
+                    )
+                    location.extend(location_map.get(subscription_id, []))
 
-                        location.extend(management_group_location)
+                    if subscription_index is None:
+                        subscription_index = self._get_subscription_index(
+                            subscription_connector
+                        )
 
+                    subscription = subscription_index.get(subscription_id)
+                    if subscription is None:
+                        with span("get_subscription"):
+                            subscription = subscription_connector.get_subscription(
+                                secret_data, subscription_id
+                            )
                     subscription_info = self.convert_nested_dictionary(
-                        subscription_connector.get_subscription(
-                            secret_data, subscription_id
-                        )
+                        subscription, self.subscription_fields
                     )
 
                     if subscription_info:
@@ -109,9 +165,70 @@ class EAManager(AzureBaseManager):
                         subscription_tags,
                     )
 
-                    results.append(result)
+                    department_results[subscription_id] = result
+                    yield result
 
-        return results
+            if self.sync_state is not None:
+                # a department located with a partial map is collected again
+                _, location_map_error = location_maps[tenant_id]
+                if location_map_error is None:
+                    self.sync_state.set_results(
+                        group_key, fingerprint, department_results
+                    )
+
+    def _list_department_subscriptions(
+        self,
+        billing_connector: BillingConnector,
+        options: dict,
+        secret_data: dict,
+        department: dict,
+        billing_account_id: str,
+    ) -> Iterator[dict]:
+        with span("list_subscription_by_department"):
+            yield from billing_connector.list_subscription_by_department(
+                options,
+                secret_data,
+                department["name"],
+                billing_account_id,
+                self.billing_subscription_projection,
+            )
+
+    def _get_subscription_details(
+        self,
+        department_subscriptions: List[dict],
+        subscription_index: dict,
+        location_map: dict,
+    ) -> dict:
+        """Tags and management group location of every subscription of the
+        department, by subscription id.
+        """
+        subscription_details = {}
+        for subscription in department_subscriptions:
+            subscription_id = subscription.get("properties", {}).get("subscriptionId")
+            if not subscription_id:
+                continue
+
+            subscription_id = subscription_id.lower()
+            subscription_tags = None
+            if (subscription := subscription_index.get(subscription_id)) is not None:
+                subscription_tags = self.convert_nested_dictionary(
+                    subscription, self.subscription_fields
+                ).get("tags")
+
+            subscription_details[subscription_id] = (
+                subscription_tags,
+                location_map.get(subscription_id, []),
+            )
+        return subscription_details
+
+    @staticmethod
+    def _get_subscription_index(subscription_connector: SubscriptionConnector) -> dict:
+        try:
+            with span("get_subscription_index"):
+                return subscription_connector.get_subscription_index()
+        except Exception as e:
+            _LOGGER.error(f"[_get_subscription_index] {e}", exc_info=True)
+            return {}
 
     @staticmethod
     def _get_enrollment_account_location(
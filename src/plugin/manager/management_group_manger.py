@@ -1,15 +1,25 @@
 import logging
-from typing import List
+from typing import TYPE_CHECKING, Tuple, Union
 
 from azure.core.exceptions import ResourceNotFoundError
 
 from plugin.connector.management_groups_connector import ManagementGroupsConnector
+from plugin.lib.location_map_cache import location_map_cache
+from plugin.lib.metrics import span
+from plugin.lib.management_group_tree import ManagementGroupTree
 from plugin.manager.base import AzureBaseManager
 
+if TYPE_CHECKING:
+    from plugin.connector.aio.http_session import AsyncHTTPSession
+
 _LOGGER = logging.getLogger("spaceone")
 
 
 class ManagementGroupManager(AzureBaseManager):
+    entity_fields = ("type", "name", "parent_display_name_chain", "parent_name_chain")
+    entity_select = ("Name", "Type", "ParentDisplayNameChain", "ParentNameChain")
+    entity_view = "SubscriptionsOnly"
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -20,48 +30,142 @@ class ManagementGroupManager(AzureBaseManager):
         tenant_id: str,
         management_group_location_map: dict,
     ) -> dict:
-        try:
-            management_groups_connector = ManagementGroupsConnector()
-            entities = management_groups_connector.list_entities(secret_data, tenant_id)
+        location_map, _ = self.get_location_map(options, secret_data, tenant_id)
+        management_group_location_map[tenant_id] = location_map
+        return management_group_location_map
+
+    def get_location_map_once(
+        self, options: dict, secret_data: dict, tenant_id: str, location_maps: dict
+    ) -> Tuple[dict, Union[Exception, None]]:
+        """Same as get_location_map, but the tenant is crawled at most once per
+        location_maps (e.g. once per sync), even when its crawl fails.
+        """
+        if tenant_id not in location_maps:
+            location_maps[tenant_id] = self.get_location_map(
+                options, secret_data, tenant_id
+            )
+        return location_maps[tenant_id]
 
-            management_group_location_map[tenant_id] = {}
+    @staticmethod
+    def get_cached_location_map(
+        options: dict, secret_data: dict, tenant_id: str
+    ) -> Union[dict, None]:
+        """Return the cached location map of the tenant, without crawling it."""
+        return location_map_cache.get(
+            location_map_cache.make_key(secret_data, tenant_id, options)
+        )
 
-            for entity in entities:
-                entity_info = self.convert_nested_dictionary(entity)
+    def get_location_map(
+        self, options: dict, secret_data: dict, tenant_id: str
+    ) -> Tuple[dict, Union[Exception, None]]:
+        """Return the management group location map of the tenant and the error
+        that stopped the crawl, if any.
 
-                if entity_info.get("type") == "/subscriptions":
-                    subscription_id = entity_info["name"]
+        After an error, the map keeps the subscriptions crawled before it. Only
+        complete maps are cached.
+        """
+        location_map = self.get_cached_location_map(options, secret_data, tenant_id)
+        if location_map is not None:
+            return location_map, None
 
-                    location = self._create_location_from_entity_info(
-                        entity_info, options
-                    )
-                    management_group_location_map[tenant_id][subscription_id] = location
+        management_group_tree = self._create_management_group_tree(options)
+        with span("get_management_group_location_map"):
+            try:
+                management_groups_connector = ManagementGroupsConnector()
+                for entity in management_groups_connector.list_entities(
+                    secret_data,
+                    tenant_id,
+                    select=self.entity_select,
+                    view=self.entity_view,
+                    entity_type="/subscriptions",
+                ):
+                    self._add_entity(management_group_tree, entity)
+            except Exception as e:
+                return self._finish_crawl(
+                    management_group_tree, options, secret_data, tenant_id, e
+                )
 
-        except ResourceNotFoundError as e:
-            _LOGGER.error(
-                f"[sync] {e.status_code} {e.message}, Please check the permission. https://learn.microsoft.com/en-us/azure/role-based-access-control/built-in-roles/management-and-governance#management-group-reader"
+        return self._finish_crawl(
+            management_group_tree, options, secret_data, tenant_id
+        )
+
+    async def get_location_map_async(
+        self,
+        options: dict,
+        secret_data: dict,
+        tenant_id: str,
+        http_session: "AsyncHTTPSession" = None,
+    ) -> Tuple[dict, Union[Exception, None]]:
+        from plugin.connector.aio.management_groups_connector import (
+            AsyncManagementGroupsConnector,
+        )
+
+        location_map = self.get_cached_location_map(options, secret_data, tenant_id)
+        if location_map is not None:
+            return location_map, None
+
+        management_group_tree = self._create_management_group_tree(options)
+        with span("get_management_group_location_map"):
+            try:
+                async with AsyncManagementGroupsConnector(
+                    secret_data=secret_data,
+                    tenant_id=tenant_id,
+                    http_session=http_session,
+                ) as management_groups_connector:
+                    async for entity in management_groups_connector.list_entities(
+                        select=self.entity_select,
+                        view=self.entity_view,
+                        entity_type="/subscriptions",
+                    ):
+                        self._add_entity(management_group_tree, entity)
+            except Exception as e:
+                return self._finish_crawl(
+                    management_group_tree, options, secret_data, tenant_id, e
+                )
+
+        return self._finish_crawl(
+            management_group_tree, options, secret_data, tenant_id
+        )
+
+    def _finish_crawl(
+        self,
+        management_group_tree: ManagementGroupTree,
+        options: dict,
+        secret_data: dict,
+        tenant_id: str,
+        error: Exception = None,
+    ) -> Tuple[dict, Union[Exception, None]]:
+        location_map = management_group_tree.to_location_map()
+        if error is None:
+            location_map_cache.set(
+                location_map_cache.make_key(secret_data, tenant_id, options),
+                location_map,
             )
+        else:
+            self._log_entities_error(error)
+        return location_map, error
 
-        except Exception as e:
-            _LOGGER.error(f"[sync] {e}", exc_info=True)
+    def _add_entity(self, management_group_tree: ManagementGroupTree, entity) -> None:
+        entity_info = self.convert_nested_dictionary(entity, self.entity_fields)
 
-        return management_group_location_map
+        if entity_info.get("type") == "/subscriptions":
+            management_group_tree.add_subscription(
+                entity_info["name"],
+                entity_info.get("parent_name_chain") or [],
+                entity_info.get("parent_display_name_chain") or [],
+            )
 
     @staticmethod
-    def _create_location_from_entity_info(
-        entity_info: dict, options: dict
-    ) -> List[dict]:
-        location = []
-        parent_display_name_chain = entity_info.get("parent_display_name_chain", [])
-        parent_name_chain = entity_info.get("parent_name_chain", [])
-        for idx, name in enumerate(parent_display_name_chain):
-            if options.get("exclude_root_management_group") and idx == 0:
-                continue
-            location.append(
-                {
-                    "name": name.strip(),
-                    "resource_id": parent_name_chain[idx],
-                }
-            )
+    def _create_management_group_tree(options: dict) -> ManagementGroupTree:
+        return ManagementGroupTree(
+            exclude_root=bool(options.get("exclude_root_management_group"))
+        )
 
-        return location
+    @staticmethod
+    def _log_entities_error(e: Exception) -> None:
+        if isinstance(e, ResourceNotFoundError):
+            _LOGGER.error(
+                f"[sync] {e.status_code} {e.message}, Please check the permission. https://learn.microsoft.com/en-us/azure/role-based-access-control/built-in-roles/management-and-governance#management-group-reader"
+            )
+        else:
+            _LOGGER.error(f"[sync] {e}", exc_info=True)
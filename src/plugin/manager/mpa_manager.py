@@ -1,21 +1,40 @@
+import asyncio
 import logging
-from typing import List, Union
+import threading
+from typing import TYPE_CHECKING, Iterator, List, Tuple, Union
 
 from azure.core.exceptions import ClientAuthenticationError
 
+from plugin.lib.checkpoint import get_checkpoint
+from plugin.lib.metrics import span
+from plugin.lib.state_store import make_fingerprint
 from plugin.manager.base import AzureBaseManager
 from plugin.connector.subscription_connector import SubscriptionConnector
 from plugin.connector.billing_connector import BillingConnector
 from plugin.manager.management_group_manger import ManagementGroupManager
 
+if TYPE_CHECKING:
+    from plugin.connector.aio.http_session import AsyncHTTPSession
+
 _LOGGER = logging.getLogger("spaceone")
 
 
 class MPAManager(AzureBaseManager):
     agreement_type = "MicrosoftPartnerAgreement"
+    billing_subscription_fields = (
+        "subscription_id",
+        "display_name",
+        "subscription_billing_status",
+        "customer_id",
+        "customer_display_name",
+    )
+    subscription_fields = ("subscription_id",)
 
     def __init__(self, *args, **kwargs):
         self.management_group_mgr = ManagementGroupManager()
+        self.subscription_info_maps = {}
+        self.subscription_info_map_stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
         super().__init__(*args, **kwargs)
 
     def sync(
@@ -25,7 +44,7 @@ class MPAManager(AzureBaseManager):
         domain_id: str,
         billing_account_id: str,
         schema_id: str = None,
-    ) -> list:
+    ) -> Iterator[dict]:
         """sync Azure resources
             :Returns:
                 results [
@@ -39,110 +58,488 @@ class MPAManager(AzureBaseManager):
                 }
         ]
         """
-        results = []
-
         billing_connector = BillingConnector(secret_data=secret_data)
-        agreement_type = self.agreement_type
-
-        management_group_location_map = {}
-        result_subscription_map = {}
-        subscription_info_map = {}
+        active_subscription_map = {}
 
         _LOGGER.debug(
             f"[sync] Start sync for tenant_id: {secret_data['tenant_id']}, agreement_type: {self.agreement_type}"
         )
 
-        for subscription in billing_connector.list_subscription(
-            options, secret_data, agreement_type, billing_account_id
+        with span("list_subscription"):
+            for subscription in billing_connector.list_subscription(
+                options, secret_data, self.agreement_type, billing_account_id
+            ):
+                self._add_active_subscription(active_subscription_map, subscription)
+
+        stored_results_map = self._get_stored_results(
+            options, secret_data, billing_account_id, active_subscription_map
+        )
+
+        # Collect management group locations and accessible subscriptions of
+        # every changed customer tenant concurrently
+        customer_tenant_ids = self._get_customer_tenant_ids(
+            active_subscription_map, stored_results_map
+        )
+        customer_tenant_info_map = {}
+        for tenant_id, customer_tenant_info, error in self.run_concurrently(
+            lambda _tenant_id: self._get_customer_tenant_info(
+                options, secret_data, _tenant_id
+            ),
+            customer_tenant_ids,
+            self.get_concurrency("customer_tenants"),
         ):
-            result = {}
+            customer_tenant_info_map[tenant_id] = self._check_customer_tenant_info(
+                tenant_id, customer_tenant_info, error
+            )
+
+        yield from self._make_results(
+            options,
+            billing_account_id,
+            active_subscription_map,
+            customer_tenant_info_map,
+            stored_results_map,
+        )
 
-            subscription_info = self.convert_nested_dictionary(subscription)
-            subscription_status = self._get_subscription_status(
-                subscription_info, agreement_type
+    async def sync_async(
+        self,
+        options: dict,
+        secret_data: dict,
+        domain_id: str,
+        billing_account_id: str,
+        schema_id: str = None,
+    ) -> List[dict]:
+        """Same as sync, but every customer tenant is collected on one event loop
+        with up to CONCURRENCY.async_customer_tenants tenants in flight.
+        """
+        # the aio connectors (aiohttp and the aio SDK clients) are only loaded here
+        from plugin.connector.aio.billing_connector import AsyncBillingConnector
+        from plugin.connector.aio.http_session import AsyncHTTPSession
+
+        active_subscription_map = {}
+
+        _LOGGER.debug(
+            f"[sync_async] Start sync for tenant_id: {secret_data['tenant_id']}, agreement_type: {self.agreement_type}"
+        )
+
+        async with AsyncHTTPSession() as http_session:
+            async with AsyncBillingConnector(
+                secret_data=secret_data, http_session=http_session
+            ) as billing_connector:
+                async for subscription in billing_connector.list_subscription(
+                    options, secret_data, self.agreement_type, billing_account_id
+                ):
+                    self._add_active_subscription(active_subscription_map, subscription)
+
+            semaphore = asyncio.Semaphore(
+                self.get_concurrency("async_customer_tenants")
+            )
+
+            async def _get_customer_tenant_info(
+                _tenant_id: str,
+            ) -> Tuple[dict, dict, bool]:
+                async with semaphore:
+                    return await self._get_customer_tenant_info_async(
+                        options, secret_data, _tenant_id, http_session
+                    )
+
+            stored_results_map = self._get_stored_results(
+                options, secret_data, billing_account_id, active_subscription_map
+            )
+            customer_tenant_ids = self._get_customer_tenant_ids(
+                active_subscription_map, stored_results_map
             )
-            subscription_id = self._get_subscription_id(
-                subscription_info, agreement_type
+            outcomes = await asyncio.gather(
+                *[
+                    _get_customer_tenant_info(tenant_id)
+                    for tenant_id in customer_tenant_ids
+                ],
+                return_exceptions=True,
             )
 
-            if not subscription_id:
+        customer_tenant_info_map = {}
+        for tenant_id, outcome in zip(customer_tenant_ids, outcomes):
+            error = outcome if isinstance(outcome, Exception) else None
+            customer_tenant_info_map[tenant_id] = self._check_customer_tenant_info(
+                tenant_id, outcome, error
+            )
+
+        return list(
+            self._make_results(
+                options,
+                billing_account_id,
+                active_subscription_map,
+                customer_tenant_info_map,
+                stored_results_map,
+            )
+        )
+
+    def _add_active_subscription(
+        self, active_subscription_map: dict, subscription
+    ) -> None:
+        subscription_info = self.convert_nested_dictionary(
+            subscription, self.billing_subscription_fields
+        )
+        subscription_status = self._get_subscription_status(
+            subscription_info, self.agreement_type
+        )
+        subscription_id = self._get_subscription_id(
+            subscription_info, self.agreement_type
+        )
+
+        if subscription_id and subscription_status in ["Active"]:
+            tenant_id = self._get_tenant_id_from_customer_id(
+                subscription_info.get("customer_id")
+            )
+            active_subscription_map[subscription_id] = (tenant_id, subscription_info)
+
+    def _make_results(
+        self,
+        options: dict,
+        billing_account_id: str,
+        active_subscription_map: dict,
+        customer_tenant_info_map: dict,
+        stored_results_map: dict,
+    ) -> Iterator[dict]:
+        """Yield the result of every active subscription, reusing the stored
+        results of unchanged customer tenants. Once all are yielded, the results
+        of the tenants that were collected completely are stored.
+        """
+        collected_results_map = {}
+        for subscription_id, active_subscription in active_subscription_map.items():
+            tenant_id, subscription_info = active_subscription
+            if tenant_id in stored_results_map:
+                yield stored_results_map[tenant_id][subscription_id]
                 continue
 
+            management_group_location_map, subscription_info_map, complete = (
+                customer_tenant_info_map[tenant_id]
+            )
+            subscription_name = self.get_subscription_name(
+                subscription_info, self.agreement_type
+            )
+
+            location = self._get_customer_location(subscription_info, tenant_id)
+            location.extend(management_group_location_map.get(subscription_id, []))
+
             inject_secret = False
-            if subscription_status in ["Active"]:
-                tenant_id = self._get_tenant_id_from_customer_id(
-                    subscription_info.get("customer_id")
-                )
-                subscription_name = self.get_subscription_name(
-                    subscription_info, agreement_type
-                )
-
-                location = self._get_customer_location(subscription_info, tenant_id)
-
-                # Check Management Group Location
-                if tenant_id not in management_group_location_map.keys():
-                    management_group_location_map = (
-                        self.management_group_mgr.get_management_group_location_map(
-                            options,
-                            secret_data,
-                            tenant_id,
-                            management_group_location_map,
-                        )
-                    )
+            if subscription_info_map.get(subscription_id):
+                inject_secret = True
+
+            result = self.make_result(
+                tenant_id,
+                subscription_id,
+                subscription_name,
+                inject_secret,
+                location,
+            )
+            if complete:
+                collected_results_map.setdefault(tenant_id, {})[
+                    subscription_id
+                ] = result
+            yield result
 
-                if management_group_location_map.get(tenant_id):
-                    management_group_location = management_group_location_map[
-                        tenant_id
-                    ].get(subscription_id)
-                    location.extend(management_group_location)
+        _LOGGER.debug(
+            f"[sync] total results: {len(active_subscription_map)}, reused tenants: {len(stored_results_map)}, "
+            f"subscription_info_map cache: {self.subscription_info_map_stats}"
+        )
+        self._set_stored_results(
+            options,
+            billing_account_id,
+            active_subscription_map,
+            customer_tenant_info_map,
+            collected_results_map,
+        )
 
-                if subscription_info_map.get("subscription_id") is None:
-                    subscription_info_map = self._get_subscription_info_map(
-                        subscription_info_map, secret_data, tenant_id
-                    )
+    def _get_stored_results(
+        self,
+        options: dict,
+        secret_data: dict,
+        billing_account_id: str,
+        active_subscription_map: dict,
+    ) -> dict:
+        """Return the stored results of the customer tenants that did not change
+        since the previous sync (incremental sync only).
+
+        A tenant is unchanged if its active subscriptions and their management
+        group locations are. Locations are only known without a crawl while the
+        location map of the tenant is cached, so the other tenants are collected.
+        """
+        if self.sync_state is None:
+            return {}
+
+        stored_results_map = {}
+        for tenant_id, subscription_infos in self._group_by_tenant(
+            active_subscription_map
+        ).items():
+            location_map = self.management_group_mgr.get_cached_location_map(
+                options, secret_data, tenant_id
+            )
+            if location_map is None:
+                continue
+
+            results = self.sync_state.get_results(
+                self._get_group_key(billing_account_id, tenant_id),
+                self._make_fingerprint(options, subscription_infos, location_map),
+            )
+            if results is not None:
+                stored_results_map[tenant_id] = results
 
-                if subscription_info_map.get(subscription_id):
-                    inject_secret = True
+        return stored_results_map
 
-                result = self.make_result(
-                    tenant_id,
-                    subscription_id,
-                    subscription_name,
-                    inject_secret,
-                    location,
-                )
+    def _set_stored_results(
+        self,
+        options: dict,
+        billing_account_id: str,
+        active_subscription_map: dict,
+        customer_tenant_info_map: dict,
+        collected_results_map: dict,
+    ) -> None:
+        if self.sync_state is None:
+            return
+
+        tenant_subscriptions = self._group_by_tenant(active_subscription_map)
+        for tenant_id, results in collected_results_map.items():
+            location_map, _, _ = customer_tenant_info_map[tenant_id]
+            self.sync_state.set_results(
+                self._get_group_key(billing_account_id, tenant_id),
+                self._make_fingerprint(
+                    options, tenant_subscriptions[tenant_id], location_map
+                ),
+                results,
+            )
 
-            if result:
-                result_subscription_map[subscription_id] = result
+    @staticmethod
+    def _group_by_tenant(active_subscription_map: dict) -> dict:
+        tenant_subscriptions = {}
+        for subscription_id, active_subscription in sorted(
+            active_subscription_map.items()
+        ):
+            tenant_id, subscription_info = active_subscription
+            tenant_subscriptions.setdefault(tenant_id, {})[
+                subscription_id
+            ] = subscription_info
+        return tenant_subscriptions
 
-        if result_subscription_map:
-            results_info = result_subscription_map.values()
-            for result_info in results_info:
-                results.append(result_info)
+    @staticmethod
+    def _make_fingerprint(
+        options: dict, subscription_infos: dict, location_map: dict
+    ) -> str:
+        return make_fingerprint(
+            options,
+            subscription_infos,
+            {
+                subscription_id: location_map.get(subscription_id, [])
+                for subscription_id in subscription_infos
+            },
+        )
 
-        _LOGGER.debug(f"[sync] total results: {len(results)}")
+    @staticmethod
+    def _get_group_key(billing_account_id: str, tenant_id: str) -> str:
+        return f"{billing_account_id}/tenant:{tenant_id}"
 
-        return results
+    @staticmethod
+    def _get_customer_tenant_ids(
+        active_subscription_map: dict, stored_results_map: dict
+    ) -> list:
+        return list(
+            dict.fromkeys(
+                tenant_id
+                for tenant_id, _ in active_subscription_map.values()
+                if tenant_id not in stored_results_map
+            )
+        )
+
+    @staticmethod
+    def _check_customer_tenant_info(
+        tenant_id: str, customer_tenant_info: tuple, error: Exception = None
+    ) -> Tuple[dict, dict, bool]:
+        if error:
+            _LOGGER.error(
+                f"[sync] Failed to collect customer tenant {tenant_id}: {error}",
+                exc_info=error,
+            )
+            return {}, {}, False
+        return customer_tenant_info
+
+    def _get_customer_tenant_info(
+        self, options: dict, secret_data: dict, tenant_id: str
+    ) -> Tuple[dict, dict, bool]:
+        """Return the management group location map and the accessible
+        subscriptions of the customer tenant, and whether both were collected
+        completely.
+        """
+        if (
+            customer_tenant_info := self._get_checkpointed_customer_tenant_info(
+                tenant_id
+            )
+        ) is not None:
+            return customer_tenant_info
+
+        location_map, location_map_error = self.management_group_mgr.get_location_map(
+            options, secret_data, tenant_id
+        )
+        subscription_info_map, subscription_info_map_error = (
+            self._get_subscription_info_map(secret_data, tenant_id)
+        )
+        return self._make_customer_tenant_info(
+            tenant_id,
+            location_map,
+            subscription_info_map,
+            location_map_error or subscription_info_map_error,
+        )
+
+    async def _get_customer_tenant_info_async(
+        self,
+        options: dict,
+        secret_data: dict,
+        tenant_id: str,
+        http_session: "AsyncHTTPSession",
+    ) -> Tuple[dict, dict, bool]:
+        if (
+            customer_tenant_info := self._get_checkpointed_customer_tenant_info(
+                tenant_id
+            )
+        ) is not None:
+            return customer_tenant_info
+
+        location_map, location_map_error = (
+            await self.management_group_mgr.get_location_map_async(
+                options, secret_data, tenant_id, http_session
+            )
+        )
+        subscription_info_map, subscription_info_map_error = (
+            await self._get_subscription_info_map_async(
+                secret_data, tenant_id, http_session
+            )
+        )
+        return self._make_customer_tenant_info(
+            tenant_id,
+            location_map,
+            subscription_info_map,
+            location_map_error or subscription_info_map_error,
+        )
+
+    @staticmethod
+    def _get_checkpointed_customer_tenant_info(
+        tenant_id: str,
+    ) -> Union[Tuple[dict, dict, bool], None]:
+        checkpoint = get_checkpoint()
+        if checkpoint and (
+            customer_tenant_info := checkpoint.get(f"tenant:{tenant_id}")
+        ):
+            return (*customer_tenant_info, True)
+        return None
+
+    @staticmethod
+    def _make_customer_tenant_info(
+        tenant_id: str,
+        location_map: dict,
+        subscription_info_map: dict,
+        error: Union[Exception, None],
+    ) -> Tuple[dict, dict, bool]:
+        """Checkpoint the customer tenant if it was collected completely."""
+        complete = error is None
+        checkpoint = get_checkpoint()
+        if checkpoint and complete:
+            checkpoint.set(f"tenant:{tenant_id}", (location_map, subscription_info_map))
+        return location_map, subscription_info_map, complete
 
     def _get_subscription_info_map(
-        self, subscription_info_map: dict, secret_data: dict, tenant_id: str
-    ) -> dict:
+        self, secret_data: dict, tenant_id: str
+    ) -> Tuple[dict, Union[Exception, None]]:
+        """Return the subscriptions of the tenant the secret can access, and the
+        error that stopped the listing, if any.
+        """
+        if (
+            subscription_info_map := self._get_cached_subscription_info_map(tenant_id)
+        ) is not None:
+            return subscription_info_map, None
+
+        subscription_info_map = {}
         try:
             subscription_connector = SubscriptionConnector(
                 secret_data=secret_data, tenant_id=tenant_id
             )
             subscriptions = subscription_connector.list_subscriptions()
-            for subscription in subscriptions:
-                subscription_info = self.convert_nested_dictionary(subscription)
-                subscription_id = subscription_info.get("subscription_id")
-                if subscription_id:
-                    subscription_info_map[subscription_id] = subscription_info
-        except ClientAuthenticationError as e:
-            pass
+            with span("list_subscriptions"):
+                for subscription in subscriptions:
+                    self._add_subscription_info(subscription_info_map, subscription)
+        except Exception as e:
+            return self._finish_subscription_info_map(
+                tenant_id, subscription_info_map, e
+            )
+
+        return self._finish_subscription_info_map(tenant_id, subscription_info_map)
+
+    async def _get_subscription_info_map_async(
+        self, secret_data: dict, tenant_id: str, http_session: "AsyncHTTPSession"
+    ) -> Tuple[dict, Union[Exception, None]]:
+        from plugin.connector.aio.subscription_connector import (
+            AsyncSubscriptionConnector,
+        )
+
+        if (
+            subscription_info_map := self._get_cached_subscription_info_map(tenant_id)
+        ) is not None:
+            return subscription_info_map, None
+
+        subscription_info_map = {}
+        try:
+            async with AsyncSubscriptionConnector(
+                secret_data=secret_data, tenant_id=tenant_id, http_session=http_session
+            ) as subscription_connector:
+                with span("list_subscriptions"):
+                    async for (
+                        subscription
+                    ) in subscription_connector.list_subscriptions():
+                        self._add_subscription_info(subscription_info_map, subscription)
         except Exception as e:
-            _LOGGER.error(f"[_get_subscription_info_map] {e}", exc_info=True)
+            return self._finish_subscription_info_map(
+                tenant_id, subscription_info_map, e
+            )
+
+        return self._finish_subscription_info_map(tenant_id, subscription_info_map)
+
+    def _finish_subscription_info_map(
+        self, tenant_id: str, subscription_info_map: dict, error: Exception = None
+    ) -> Tuple[dict, Union[Exception, None]]:
+        """A tenant that rejects the secret has no accessible subscription, which
+        is a complete answer and not an error. Maps cut short by an error are
+        returned as they are and not cached.
+        """
+        if error is not None and not isinstance(error, ClientAuthenticationError):
+            _LOGGER.error(f"[_get_subscription_info_map] {error}", exc_info=error)
+            return subscription_info_map, error
+
+        return (
+            self._set_cached_subscription_info_map(tenant_id, subscription_info_map),
+            None,
+        )
+
+    def _get_cached_subscription_info_map(self, tenant_id: str) -> Union[dict, None]:
+        with self._lock:
+            if tenant_id in self.subscription_info_maps:
+                self.subscription_info_map_stats["hits"] += 1
+                return self.subscription_info_maps[tenant_id]
+
+            self.subscription_info_map_stats["misses"] += 1
+            return None
+
+    def _set_cached_subscription_info_map(
+        self, tenant_id: str, subscription_info_map: dict
+    ) -> dict:
+        with self._lock:
+            return self.subscription_info_maps.setdefault(
+                tenant_id, subscription_info_map
+            )
 
-        return subscription_info_map
+    def _add_subscription_info(self, subscription_info_map: dict, subscription) -> None:
+        subscription_info = self.convert_nested_dictionary(
+            subscription, self.subscription_fields
+        )
+        subscription_id = subscription_info.get("subscription_id")
+        if subscription_id:
+            subscription_info_map[subscription_id.lower()] = subscription_info
 
     @staticmethod
     def _get_subscription_status(subscription_info: dict, agreement_type: str) -> str:
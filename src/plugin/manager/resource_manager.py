@@ -1,6 +1,9 @@
 import logging
+from typing import Iterator
 
 from plugin.connector.subscription_connector import SubscriptionConnector
+from plugin.lib.metrics import span
+from plugin.lib.state_store import make_fingerprint
 from plugin.manager.base import AzureBaseManager
 from plugin.manager.management_group_manger import ManagementGroupManager
 
@@ -9,6 +12,13 @@ _LOGGER = logging.getLogger("spaceone")
 
 class ResourceManager(AzureBaseManager):
     agreement_type = "Unknown"
+    subscription_fields = (
+        "subscription_id",
+        "display_name",
+        "state",
+        "tenant_id",
+        "tags",
+    )
 
     def __init__(self, *args, **kwargs):
         self.management_group_mgr = ManagementGroupManager()
@@ -16,7 +26,7 @@ class ResourceManager(AzureBaseManager):
 
     def sync(
         self, options: dict, secret_data: dict, domain_id: str, schema_id: str = None
-    ) -> list:
+    ) -> Iterator[dict]:
         """sync Azure resources
             :Returns:
                 results [
@@ -30,25 +40,62 @@ class ResourceManager(AzureBaseManager):
                 }
         ]
         """
-        results = []
-
         subscription_connector = SubscriptionConnector(secret_data=secret_data)
         agreement_type = self.agreement_type
 
-        management_group_location_map = {}
-        result_subscription_map = {}
+        location_maps = {}
+        result_subscription_ids = set()
         subscription_info_map = {}
 
         _LOGGER.debug(
             f"[sync] Start sync for tenant_id: {secret_data['tenant_id']}, agreement_type: {self.agreement_type}"
         )
 
-        for tenant in subscription_connector.list_tenants():
-            for subscription in subscription_connector.list_subscriptions():
-                result = {}
-                subscription_info = self.convert_nested_dictionary(subscription)
+        with span("list_tenants"):
+            tenant_map = {
+                tenant.tenant_id: tenant
+                for tenant in subscription_connector.list_tenants()
+            }
+        with span("list_subscriptions"):
+            tenant_subscription_map = self._group_subscriptions_by_tenant(
+                subscription_connector.list_subscriptions(), secret_data["tenant_id"]
+            )
+
+        for tenant_id, subscription_infos in tenant_subscription_map.items():
+            tenant = tenant_map.get(tenant_id)
+            tenant_display_name = getattr(tenant, "display_name", None)
+
+            # An unchanged tenant reuses its stored results. The management group
+            # locations are part of the fingerprint, so the tenant's crawl is only
+            # skipped while its location map is cached (incremental sync only).
+            if self.sync_state is not None:
+                location_map, _ = self.management_group_mgr.get_location_map_once(
+                    options, secret_data, tenant_id, location_maps
+                )
+                management_group_locations = [
+                    location_map.get(
+                        self.get_subscription_id(subscription_info, agreement_type)
+                    )
+                    for subscription_info in subscription_infos
+                ]
+                group_key = f"tenant:{tenant_id}"
+                fingerprint = make_fingerprint(
+                    options,
+                    tenant_display_name,
+                    subscription_infos,
+                    management_group_locations,
+                )
+                results = self.sync_state.get_results(group_key, fingerprint)
+                if results is not None:
+                    for subscription_id, result in results.items():
+                        if subscription_id not in result_subscription_ids:
+                            result_subscription_ids.add(subscription_id)
+                            yield result
+                    continue
 
-                tenant_id = tenant.tenant_id
+            tenant_results = {}
+            for subscription_info in subscription_infos:
+                result = {}
                 subscription_status = self.get_subscription_status(
                     subscription_info, agreement_type
                 )
@@ -69,20 +116,12 @@ class ResourceManager(AzureBaseManager):
 
                     location = []
 
-                    if tenant_id not in management_group_location_map.keys():
-                        management_group_location_map = (
-                            self.management_group_mgr.get_management_group_location_map(
-                                options,
-                                secret_data,
-                                tenant_id,
-                                management_group_location_map,
-                            )
-                        )
+                    location_map, _ = self.management_group_mgr.get_location_map_once(
+                        options, secret_data, tenant_id, location_maps
+                    )
 
-                    if management_group_location_map.get(tenant_id):
-                        management_group_location = management_group_location_map[
-                            tenant_id
-                        ].get(subscription_id)
+                    if location_map:
+                        management_group_location = location_map.get(subscription_id)
 
                         use_mg_as_workspace = options.get(
                             "azure_management_group_mapping_type"
@@ -115,7 +154,7 @@ class ResourceManager(AzureBaseManager):
                         else:
                             location = [
                                 {
-                                    "name": tenant.display_name or "Home",
+                                    "name": tenant_display_name or "Home",
                                     "resource_id": tenant_id,
                                 }
                             ]
@@ -133,15 +172,29 @@ class ResourceManager(AzureBaseManager):
                         location,
                         subscription_tags,
                     )
-
-                if result:
-                    result_subscription_map[subscription_id] = result
-
-        if result_subscription_map:
-            results_info = result_subscription_map.values()
-            for result_info in results_info:
-                results.append(result_info)
-
-        _LOGGER.debug(f"[sync] total results: {len(results)}")
-
-        return results
+                    tenant_results[subscription_id] = result
+
+                if result and subscription_id not in result_subscription_ids:
+                    result_subscription_ids.add(subscription_id)
+                    yield result
+
+            if self.sync_state is not None:
+                # a tenant located with a partial map is collected again
+                _, location_map_error = location_maps[tenant_id]
+                if location_map_error is None:
+                    self.sync_state.set_results(group_key, fingerprint, tenant_results)
+
+        _LOGGER.debug(f"[sync] total results: {len(result_subscription_ids)}")
+
+    def _group_subscriptions_by_tenant(
+        self, subscriptions: list, default_tenant_id: str
+    ) -> dict:
+        tenant_subscription_map = {}
+        for subscription in subscriptions:
+            subscription_info = self.convert_nested_dictionary(
+                subscription, self.subscription_fields
+            )
+            tenant_id = subscription_info.get("tenant_id") or default_tenant_id
+            tenant_subscription_map.setdefault(tenant_id, []).append(subscription_info)
+
+        return tenant_subscription_map
@@ -0,0 +1,116 @@
+"""Micro-benchmark of the SDK model converter over synthetic subscriptions.
+
+Compares the converter that AzureBaseManager.convert_nested_dictionary used
+before plugin.lib.converter (kept below as `legacy_convert`) with
+ModelConverter, converting whole models and only the fields the managers read.
+
+    python test/benchmark/bench_converter.py --models 50000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from azure.mgmt.resource.subscriptions.models import (  # noqa: E402
+    ManagedByTenant,
+    Subscription,
+    SubscriptionPolicies,
+)
+
+from plugin.lib.converter import ModelConverter  # noqa: E402
+from plugin.manager.resource_manager import ResourceManager  # noqa: E402
+
+
+def legacy_convert(cloud_svc_object):
+    cloud_svc_dict = {}
+    if hasattr(cloud_svc_object, "__dict__"):
+        cloud_svc_dict = cloud_svc_object.__dict__
+    elif isinstance(cloud_svc_object, dict):
+        cloud_svc_dict = cloud_svc_object
+    elif not isinstance(cloud_svc_object, list):
+        return cloud_svc_object
+
+    for key, value in cloud_svc_dict.items():
+        if hasattr(value, "__dict__") or isinstance(value, dict):
+            cloud_svc_dict[key] = legacy_convert(value)
+        if "azure" in str(type(value)):
+            cloud_svc_dict[key] = legacy_convert(value)
+        elif isinstance(value, list):
+            value_list = []
+            for v in value:
+                value_list.append(legacy_convert(v))
+            cloud_svc_dict[key] = value_list
+
+    return cloud_svc_dict
+
+
+def make_models(count: int) -> list:
+    models = []
+    for index in range(count):
+        subscription = Subscription(
+            tags={"env": "prod", "owner": f"team-{index % 50}", "index": str(index)},
+            managed_by_tenants=[ManagedByTenant(), ManagedByTenant()],
+            authorization_source="RoleBased",
+        )
+        # read-only attributes are only set by the deserializer
+        subscription.id = f"/subscriptions/{index:08d}-0000-0000-0000-000000000000"
+        subscription.subscription_id = f"{index:08d}-0000-0000-0000-000000000000"
+        subscription.display_name = f"subscription-{index}"
+        subscription.tenant_id = "00000000-0000-0000-0000-000000000001"
+        subscription.state = "Enabled"
+        subscription.subscription_policies = SubscriptionPolicies()
+        subscription.subscription_policies.location_placement_id = "Public_2014-09-01"
+        subscription.subscription_policies.quota_id = "EnterpriseAgreement_2014-09-01"
+        models.append(subscription)
+    return models
+
+
+def measure(convert, count: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        # the legacy converter modifies the models, so every run gets new ones
+        models = make_models(count)
+        started_at = time.perf_counter()
+        for model in models:
+            convert(model)
+        timings.append(time.perf_counter() - started_at)
+
+    best = min(timings)
+    return {"seconds": round(best, 3), "us_per_model": round(best / count * 1e6, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    fields = ResourceManager.subscription_fields
+    report = {
+        "models": args.models,
+        "legacy": measure(legacy_convert, args.models, args.repeat),
+        "converter": measure(ModelConverter().convert, args.models, args.repeat),
+        "converter_fields": measure(
+            lambda model, converter=ModelConverter(): converter.convert(model, fields),
+            args.models,
+            args.repeat,
+        ),
+    }
+    for name in ("converter", "converter_fields"):
+        report[name]["speedup"] = round(
+            report["legacy"]["seconds"] / report[name]["seconds"], 1
+        )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark the time to first token of a new connector against the mock AAD.
+
+Before the shared token cache, every connector built its own
+DefaultAzureCredential from the secret written into os.environ, so every new
+connector walked the credential chain and requested a new token. Now every
+connector asks the process-wide TokenCache, which keeps one
+ClientSecretCredential and its tokens per tenant/client.
+
+    python test/benchmark/bench_first_token.py --connectors 20
+
+--include-chain also measures DefaultAzureCredential without the secret in
+the environment: it probes managed identity (IMDS) and the developer tools
+before it gives up, which is what a connector in a container paid when the
+environment was not set up. It needs no network but can take seconds.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+from harness import EstateSpec, MockAzureServer, configure_plugin, make_secret_data
+
+
+def measure(get_token, connectors: int) -> dict:
+    timings = []
+    for _ in range(connectors):
+        started_at = time.perf_counter()
+        get_token()
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        "first": round(timings[0], 4),
+        "median": round(statistics.median(timings), 4),
+        "total": round(sum(timings), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--connectors", type=int, default=10, help="connectors created in a row"
+    )
+    parser.add_argument("--include-chain", action="store_true")
+    args = parser.parse_args()
+
+    from azure.identity import DefaultAzureCredential
+
+    from plugin.connector.azure_cloud import get_arm_scope
+    from plugin.connector.token_cache import token_cache
+
+    with MockAzureServer(EstateSpec(agreement_type="Unknown")) as mock:
+        configure_plugin(mock, LOG={"loggers": {"spaceone": {"level": "WARNING"}}})
+        secret_data = make_secret_data()
+        scope = get_arm_scope()
+
+        def get_default_credential_token():
+            credential = DefaultAzureCredential(
+                authority=mock.base_url, disable_instance_discovery=True
+            )
+            return credential.get_token(scope)
+
+        report = {}
+
+        os.environ.update(
+            {
+                "AZURE_TENANT_ID": secret_data["tenant_id"],
+                "AZURE_CLIENT_ID": secret_data["client_id"],
+                "AZURE_CLIENT_SECRET": secret_data["client_secret"],
+            }
+        )
+        mock.reset_stats()
+        report["default_credential"] = measure(
+            get_default_credential_token, args.connectors
+        )
+        report["default_credential"]["requests"] = mock.get_stats()["routes"]
+
+        for key in ("AZURE_TENANT_ID", "AZURE_CLIENT_ID", "AZURE_CLIENT_SECRET"):
+            del os.environ[key]
+
+        if args.include_chain:
+            # the chain fails here, what matters is how long it takes to do so
+            logging.getLogger("azure.identity").setLevel(logging.CRITICAL)
+            started_at = time.perf_counter()
+            try:
+                get_default_credential_token()
+                error = None
+            except Exception as e:
+                error = str(e).splitlines()[0]
+            report["default_credential_chain"] = {
+                "first": round(time.perf_counter() - started_at, 4),
+                "error": error,
+            }
+
+        token_cache.clear()
+        mock.reset_stats()
+        report["token_cache"] = measure(
+            lambda: token_cache.get_access_token(secret_data), args.connectors
+        )
+        report["token_cache"]["requests"] = mock.get_stats()["routes"]
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark the import time of the plugin and the modules it loads lazily.
+
+Every import runs in a new interpreter, so nothing is cached between samples.
+For plugin.main the report also lists the Azure SDK packages that the import
+loaded; AccountCollector.init should not need any of them.
+
+    python test/benchmark/bench_import_time.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src"
+)
+
+MODULES = [
+    # the SpaceONE plugin server alone, the floor of plugin.main
+    "spaceone.identity.plugin.account_collector.lib.server",
+    "plugin.main",
+    # loaded on the first sync
+    "plugin.manager.ea_manager",
+    "plugin.manager.mpa_manager",
+    "plugin.manager.resource_manager",
+    "azure.identity",
+    "azure.mgmt.resource",
+    "azure.mgmt.managementgroups",
+]
+
+SDK_PACKAGES = (
+    "azure.identity",
+    "azure.mgmt.resource",
+    "azure.mgmt.managementgroups",
+    "azure.mgmt.billing",
+    "aiohttp",
+)
+
+# the plugin server loads the plugin config before it imports anything else
+SAMPLE = """
+import json, sys, time
+from spaceone.core import config
+config.init_conf(package="plugin")
+config.set_service_config()
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+loaded = sorted(name for name in {sdk_packages!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, *sys.path[1:]]))
+    code = SAMPLE.format(module=module, sdk_packages=SDK_PACKAGES)
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+
+    return {
+        "median": round(statistics.median(s["seconds"] for s in samples), 3),
+        "min": round(min(s["seconds"] for s in samples), 3),
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    report = {module: measure(module, args.repeat) for module in args.modules}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
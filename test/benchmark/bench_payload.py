@@ -0,0 +1,132 @@
+"""Benchmark the parsing of large EA billing subscription pages.
+
+Before plugin.lib.payload, every billing page was decoded with
+`response.json()` and its items were kept whole until the sync ended. Now the
+page is decoded with orjson, when it is installed, and each item is reduced to
+EAManager.billing_subscription_projection. The fixtures are generated pages of
+billing subscriptions with the properties of the real payloads plus a bulky
+blob standing in for the parts the plugin does not read.
+
+    python test/benchmark/bench_payload.py --pages 5 --page-mb 4
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from plugin.lib import payload  # noqa: E402
+from plugin.manager.ea_manager import EAManager  # noqa: E402
+
+
+def make_item(index: int, blob_size: int) -> dict:
+    subscription_id = f"{index:08d}-0000-0000-0000-000000000000"
+    return {
+        "id": f"/providers/Microsoft.Billing/billingAccounts/1234567/billingSubscriptions/{subscription_id}",
+        "name": subscription_id,
+        "type": "Microsoft.Billing/billingAccounts/billingSubscriptions",
+        "properties": {
+            "subscriptionId": subscription_id,
+            "displayName": f"subscription-{index}",
+            "enrollmentAccountId": f"{200000 + index % 100}",
+            "enrollmentAccountDisplayName": f"Enrollment account {index % 100}",
+            "enrollmentAccountSubscriptionDetails": {
+                "enrollmentAccountStatus": "Active",
+                "subscriptionEnrollmentAccountStatus": "Active",
+                "enrollmentAccountStartDate": "2020-01-01T00:00:00Z",
+            },
+            "departmentId": f"{index % 20}",
+            "status": "Active",
+            "skuDescription": "Microsoft Azure Enterprise",
+            "lastMonthCharges": {"currency": "USD", "value": 1234.56},
+            "resourceUri": f"/subscriptions/{subscription_id}",
+            "meterDetails": [
+                {"meterId": f"{index}-{meter}", "usage": meter * 1.5, "unit": "Hours"}
+                for meter in range(blob_size // 64)
+            ],
+        },
+    }
+
+
+def make_pages(pages: int, page_mb: float, items_per_page: int) -> list:
+    blob_size = int(page_mb * 1024 * 1024 / items_per_page)
+    fixtures = []
+    for page in range(pages):
+        start = page * items_per_page
+        body = {
+            "value": [make_item(start + i, blob_size) for i in range(items_per_page)],
+            "nextLink": None if page == pages - 1 else f"https://mock/page/{page + 1}",
+        }
+        fixtures.append(json.dumps(body).encode())
+    return fixtures
+
+
+def parse_baseline(content: bytes) -> list:
+    return json.loads(content).get("value", [])
+
+
+def parse_projected(content: bytes) -> list:
+    projection = EAManager.billing_subscription_projection
+    return [
+        payload.project(value, projection)
+        for value in payload.loads(content).get("value", [])
+    ]
+
+
+def measure(parse, fixtures: list, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for content in fixtures:
+            parse(content)
+        timings.append(time.perf_counter() - started_at)
+
+    # what a sync holds on to once every page has been read
+    gc.collect()
+    tracemalloc.start()
+    kept = [parse(content) for content in fixtures]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return {
+        "seconds": round(min(timings), 3),
+        "retained_mb": round(retained / 1024 / 1024, 1),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--page-mb", type=float, default=4.0)
+    parser.add_argument("--items-per-page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    fixtures = make_pages(args.pages, args.page_mb, args.items_per_page)
+    report = {
+        "pages": args.pages,
+        "page_mb": round(sum(map(len, fixtures)) / len(fixtures) / 1024 / 1024, 2),
+        "orjson": payload.orjson is not None,
+        "baseline": measure(parse_baseline, fixtures, args.repeat),
+        "projected": measure(parse_projected, fixtures, args.repeat),
+    }
+    report["projected"]["speedup"] = round(
+        report["baseline"]["seconds"] / report["projected"]["seconds"], 1
+    )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
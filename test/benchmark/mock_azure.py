@@ -0,0 +1,714 @@
+"""Local HTTPS mock of Azure Resource Manager and the AAD token endpoint.
+
+The mock serves a synthetic estate (see `Estate`) that is generated from an
+`EstateSpec`, so the same spec always yields the same tenants, departments,
+subscriptions and management groups. Only the endpoints the plugin calls are
+implemented:
+
+- AAD: OpenID configuration and client-credential tokens, per tenant
+- Billing: billing accounts, EA departments and billing subscriptions, MPA
+  billing subscriptions
+- Resource Manager: tenants, subscriptions (list and get), management group
+  entities
+
+The caller's tenant is taken from its bearer token, so customer tenants only
+see their own subscriptions and management groups. The server runs in a
+child process (`MockAzureServer`) so that it does not count towards the
+memory of the sync being measured.
+
+The server certificate is self-signed. Each `MockAzureServer` creates its own
+in a temporary directory when it starts, and points REQUESTS_CA_BUNDLE and
+SSL_CERT_FILE at it until it stops, so the plugin must open its connections
+to the mock while the server is running.
+"""
+
+import datetime
+import ipaddress
+import json
+import multiprocessing
+import os
+import re
+import ssl
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+__all__ = ["EstateSpec", "Estate", "MockAzureServer"]
+
+AGREEMENT_TYPES = ("EnterpriseAgreement", "MicrosoftPartnerAgreement", "Unknown")
+# requests reads the first, the ssl default context (aiohttp) the second
+CA_ENVIRON_KEYS = ("REQUESTS_CA_BUNDLE", "SSL_CERT_FILE")
+
+
+def _create_certificate(directory: str) -> tuple:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [
+                    x509.DNSName("localhost"),
+                    x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+                ]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_file = os.path.join(directory, "cert.pem")
+    key_file = os.path.join(directory, "key.pem")
+    with open(cert_file, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_file, key_file
+
+
+class EstateSpec:
+    """Shape of a synthetic estate.
+
+    subscriptions are spread round-robin over the customer tenants (MPA), the
+    tenants (Unknown) or the departments (EA). Every tenant has three branches
+    of management groups, mg_depth groups deep including the root group.
+    """
+
+    def __init__(
+        self,
+        agreement_type: str = "EnterpriseAgreement",
+        tenants: int = 1,
+        departments: int = 1,
+        subscriptions: int = 100,
+        mg_depth: int = 3,
+        page_size: int = 100,
+        active_ratio: float = 1.0,
+    ):
+        if agreement_type not in AGREEMENT_TYPES:
+            raise ValueError(f"agreement_type must be one of {AGREEMENT_TYPES}")
+
+        self.agreement_type = agreement_type
+        self.tenants = tenants
+        self.departments = departments
+        self.subscriptions = subscriptions
+        self.mg_depth = mg_depth
+        self.page_size = page_size
+        self.active_ratio = active_ratio
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        return f"EstateSpec({self.to_dict()})"
+
+
+def _make_id(kind: int, index: int) -> str:
+    return str(uuid.UUID(int=(kind << 96) | index))
+
+
+class Estate:
+    """Synthetic tenants, departments, subscriptions and management groups."""
+
+    home_tenant_id = _make_id(1, 0)
+    client_id = _make_id(2, 0)
+    billing_account_id = "12345678"
+
+    def __init__(self, spec: EstateSpec):
+        self.spec = spec
+
+        if spec.agreement_type == "EnterpriseAgreement":
+            self.tenant_ids = [self.home_tenant_id]
+        else:
+            self.tenant_ids = [_make_id(3, index) for index in range(spec.tenants)]
+
+        self.departments = [
+            {"name": str(100000 + index), "departmentName": f"Department {index}"}
+            for index in range(spec.departments)
+        ]
+
+        active_count = round(spec.subscriptions * spec.active_ratio)
+        self.subscriptions = []
+        for index in range(spec.subscriptions):
+            owner_index = index % (
+                len(self.departments)
+                if spec.agreement_type == "EnterpriseAgreement"
+                else len(self.tenant_ids)
+            )
+            if spec.agreement_type == "EnterpriseAgreement":
+                tenant_id, department = (
+                    self.home_tenant_id,
+                    self.departments[owner_index],
+                )
+            else:
+                tenant_id, department = self.tenant_ids[owner_index], None
+
+            self.subscriptions.append(
+                {
+                    "subscription_id": _make_id(4, index),
+                    "display_name": f"Subscription {index}",
+                    "tenant_id": tenant_id,
+                    "department": department,
+                    "branch": index % 3,
+                    "active": index < active_count,
+                    "tags": {"index": str(index), "team": f"team-{index % 7}"},
+                }
+            )
+
+        self._subscriptions_by_id = {
+            subscription["subscription_id"]: subscription
+            for subscription in self.subscriptions
+        }
+        self._subscriptions_by_tenant = {}
+        for subscription in self.subscriptions:
+            self._subscriptions_by_tenant.setdefault(
+                subscription["tenant_id"], []
+            ).append(subscription)
+
+    @property
+    def expected_results(self) -> int:
+        return sum(subscription["active"] for subscription in self.subscriptions)
+
+    def get_subscription(self, subscription_id: str) -> dict:
+        return self._subscriptions_by_id.get(subscription_id)
+
+    def list_visible_subscriptions(self, tenant_id: str) -> list:
+        # the home credential sees every subscription it is a guest of, the
+        # customer tenants only see their own
+        if tenant_id == self.home_tenant_id:
+            return self.subscriptions
+        return self._subscriptions_by_tenant.get(tenant_id, [])
+
+    def list_visible_tenant_ids(self, tenant_id: str) -> list:
+        if tenant_id == self.home_tenant_id:
+            return list(dict.fromkeys([self.home_tenant_id, *self.tenant_ids]))
+        return [tenant_id]
+
+    def get_management_group_chain(self, subscription: dict) -> tuple:
+        tenant_id = subscription["tenant_id"]
+        names = [tenant_id]
+        display_names = ["Tenant Root Group"]
+        for level in range(1, self.spec.mg_depth):
+            names.append(f"mg-{tenant_id[-4:]}-{subscription['branch']}-{level}")
+            display_names.append(f"Group {subscription['branch']}.{level}")
+        return names[: self.spec.mg_depth], display_names[: self.spec.mg_depth]
+
+    def list_management_groups(self, tenant_id: str) -> list:
+        management_groups = {}
+        for subscription in self._subscriptions_by_tenant.get(tenant_id, []):
+            names, display_names = self.get_management_group_chain(subscription)
+            for index, (name, display_name) in enumerate(zip(names, display_names)):
+                management_groups[name] = (
+                    display_name,
+                    names[:index],
+                    display_names[:index],
+                )
+        return [
+            (name, display_name, parent_names, parent_display_names)
+            for name, (
+                display_name,
+                parent_names,
+                parent_display_names,
+            ) in management_groups.items()
+        ]
+
+
+class _MockAzureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_MockAzureHTTPServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        if length := int(self.headers.get("Content-Length") or 0):
+            self.rfile.read(length)
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        path = parsed.path.rstrip("/")
+
+        if path.startswith("/_mock/"):
+            return self._send_mock_command(method, path)
+
+        for route, pattern, methods, handler in self.server.routes:
+            if method in methods and (match := pattern.fullmatch(path)):
+                self.server.count(route)
+                if self.server.latency:
+                    time.sleep(self.server.latency)
+                return handler(self, query, path, **match.groupdict())
+
+        self._send_json({"error": {"code": "NotFound", "message": path}}, 404)
+
+    # AAD
+
+    def _openid_configuration(self, query: dict, path: str, tenant_id: str) -> None:
+        base_url = self.server.base_url
+        self._send_json(
+            {
+                "token_endpoint": f"{base_url}/{tenant_id}/oauth2/v2.0/token",
+                "authorization_endpoint": f"{base_url}/{tenant_id}/oauth2/v2.0/authorize",
+                "issuer": f"{base_url}/{tenant_id}/v2.0",
+            }
+        )
+
+    def _token(self, query: dict, path: str, tenant_id: str) -> None:
+        self._send_json(
+            {
+                "token_type": "Bearer",
+                "expires_in": 3600,
+                "ext_expires_in": 3600,
+                "access_token": f"mock.{tenant_id}",
+            }
+        )
+
+    # Billing
+
+    def _billing_accounts(self, query: dict, path: str) -> None:
+        estate = self.server.estate
+        value = []
+        if estate.spec.agreement_type != "Unknown":
+            value.append(
+                {
+                    "id": f"/providers/Microsoft.Billing/billingAccounts/{estate.billing_account_id}",
+                    "name": estate.billing_account_id,
+                    "type": "Microsoft.Billing/billingAccounts",
+                    "properties": {
+                        "agreementType": estate.spec.agreement_type,
+                        "displayName": "Mock billing account",
+                        "accountStatus": "Active",
+                    },
+                }
+            )
+        self._send_json({"value": value})
+
+    def _departments(self, query: dict, path: str, billing_account_id: str) -> None:
+        items = [
+            {
+                "id": f"{path}/{department['name']}",
+                "name": department["name"],
+                "type": "Microsoft.Billing/billingAccounts/departments",
+                "properties": {
+                    "departmentName": department["departmentName"],
+                    "costCenter": "CC-0001",
+                    "status": "Active",
+                },
+            }
+            for department in self.server.estate.departments
+        ]
+        self._send_page(items, query, path)
+
+    def _department_subscriptions(
+        self, query: dict, path: str, billing_account_id: str, department_id: str
+    ) -> None:
+        items = [
+            self._make_ea_billing_subscription(subscription)
+            for subscription in self.server.estate.subscriptions
+            if subscription["department"]["name"] == department_id
+        ]
+        self._send_page(items, query, path)
+
+    def _billing_subscriptions(
+        self, query: dict, path: str, billing_account_id: str
+    ) -> None:
+        estate = self.server.estate
+        if estate.spec.agreement_type == "EnterpriseAgreement":
+            make_item = self._make_ea_billing_subscription
+        else:
+            make_item = self._make_mpa_billing_subscription
+        self._send_page([make_item(item) for item in estate.subscriptions], query, path)
+
+    def _make_ea_billing_subscription(self, subscription: dict) -> dict:
+        department = subscription["department"]
+        subscription_id = subscription["subscription_id"]
+        enrollment_account_id = f"{200000 + int(department['name']) % 100000}"
+        status = "Active" if subscription["active"] else "Inactive"
+        # the real payloads carry many properties the plugin does not read
+        return {
+            "id": f"/providers/Microsoft.Billing/billingAccounts/{self.server.estate.billing_account_id}/billingSubscriptions/{subscription_id}",
+            "name": subscription_id,
+            "type": "Microsoft.Billing/billingAccounts/billingSubscriptions",
+            "properties": {
+                "subscriptionId": subscription_id,
+                "displayName": subscription["display_name"],
+                "enrollmentAccountId": enrollment_account_id,
+                "enrollmentAccountDisplayName": f"Enrollment account {enrollment_account_id}",
+                "enrollmentAccountSubscriptionDetails": {
+                    "enrollmentAccountStatus": "Active",
+                    "subscriptionEnrollmentAccountStatus": status,
+                    "enrollmentAccountStartDate": "2020-01-01T00:00:00Z",
+                },
+                "departmentId": department["name"],
+                "departmentDisplayName": department["departmentName"],
+                "status": status,
+                "skuId": "0001",
+                "skuDescription": "Microsoft Azure Enterprise",
+                "offerId": "MS-AZR-0017P",
+                "costCenter": "CC-0001",
+                "autoRenew": "On",
+                "billingFrequency": "P1M",
+                "lastMonthCharges": {"currency": "USD", "value": 1234.56},
+                "monthToDateCharges": {"currency": "USD", "value": 345.67},
+                "provisioningTenantId": subscription["tenant_id"],
+                "resourceUri": f"/subscriptions/{subscription_id}",
+                "renewalTermDetails": {
+                    "billingFrequency": "P1M",
+                    "productId": "DZH318Z0BPS6",
+                    "productTypeId": "XYZ56789",
+                    "skuId": "0001",
+                    "termDuration": "P1Y",
+                    "quantity": 1,
+                },
+                "systemOverrides": {"cancellation": "Allowed"},
+            },
+        }
+
+    def _make_mpa_billing_subscription(self, subscription: dict) -> dict:
+        subscription_id = subscription["subscription_id"]
+        tenant_id = subscription["tenant_id"]
+        return {
+            "id": f"/providers/Microsoft.Billing/billingAccounts/{self.server.estate.billing_account_id}/billingSubscriptions/{subscription_id}",
+            "name": subscription_id,
+            "type": "Microsoft.Billing/billingAccounts/billingSubscriptions",
+            "properties": {
+                "subscriptionId": subscription_id,
+                "displayName": subscription["display_name"],
+                "subscriptionBillingStatus": (
+                    "Active" if subscription["active"] else "Inactive"
+                ),
+                "customerId": f"/providers/Microsoft.Billing/billingAccounts/{self.server.estate.billing_account_id}/customers/{tenant_id}",
+                "customerDisplayName": f"Customer {tenant_id[-4:]}",
+                "skuId": "0001",
+                "skuDescription": "Microsoft Azure Plan",
+            },
+        }
+
+    # Resource Manager
+
+    def _tenants(self, query: dict, path: str) -> None:
+        items = [
+            {
+                "id": f"/tenants/{tenant_id}",
+                "tenantId": tenant_id,
+                "displayName": f"Tenant {tenant_id[-4:]}",
+                "tenantCategory": "Home",
+            }
+            for tenant_id in self.server.estate.list_visible_tenant_ids(
+                self._get_caller_tenant_id()
+            )
+        ]
+        self._send_page(items, query, path)
+
+    def _subscriptions(self, query: dict, path: str) -> None:
+        items = [
+            self._make_subscription(subscription)
+            for subscription in self.server.estate.list_visible_subscriptions(
+                self._get_caller_tenant_id()
+            )
+        ]
+        self._send_page(items, query, path)
+
+    def _subscription(self, query: dict, path: str, subscription_id: str) -> None:
+        subscription = self.server.estate.get_subscription(subscription_id)
+        if subscription is None:
+            return self._send_json(
+                {"error": {"code": "SubscriptionNotFound", "message": path}}, 404
+            )
+        self._send_json(self._make_subscription(subscription))
+
+    @staticmethod
+    def _make_subscription(subscription: dict) -> dict:
+        return {
+            "id": f"/subscriptions/{subscription['subscription_id']}",
+            "subscriptionId": subscription["subscription_id"],
+            "displayName": subscription["display_name"],
+            "tenantId": subscription["tenant_id"],
+            "state": "Enabled" if subscription["active"] else "Disabled",
+            "tags": subscription["tags"],
+            "authorizationSource": "RoleBased",
+            "subscriptionPolicies": {
+                "locationPlacementId": "Public_2014-09-01",
+                "quotaId": "EnterpriseAgreement_2014-09-01",
+                "spendingLimit": "Off",
+            },
+        }
+
+    def _entities(self, query: dict, path: str) -> None:
+        estate = self.server.estate
+        tenant_id = self._get_caller_tenant_id()
+
+        items = []
+        if query.get("$view") != "SubscriptionsOnly":
+            items = [
+                {
+                    "id": f"/providers/Microsoft.Management/managementGroups/{name}",
+                    "type": "Microsoft.Management/managementGroups",
+                    "name": name,
+                    "properties": {
+                        "tenantId": tenant_id,
+                        "displayName": display_name,
+                        "parentNameChain": parent_names,
+                        "parentDisplayNameChain": parent_display_names,
+                        "permissions": "view",
+                        "inheritedPermissions": "view",
+                    },
+                }
+                for name, display_name, parent_names, parent_display_names in estate.list_management_groups(
+                    tenant_id
+                )
+            ]
+        for subscription in estate.list_visible_subscriptions(tenant_id):
+            if subscription["tenant_id"] != tenant_id:
+                continue
+            names, display_names = estate.get_management_group_chain(subscription)
+            items.append(
+                {
+                    "id": f"/subscriptions/{subscription['subscription_id']}",
+                    "type": "/subscriptions",
+                    "name": subscription["subscription_id"],
+                    "properties": {
+                        "tenantId": tenant_id,
+                        "displayName": subscription["display_name"],
+                        "parentNameChain": names,
+                        "parentDisplayNameChain": display_names,
+                        "permissions": "view",
+                        "inheritedPermissions": "view",
+                        "numberOfDescendants": 0,
+                    },
+                }
+            )
+        self._send_page(items, query, path)
+
+    # helpers
+
+    def _get_caller_tenant_id(self) -> str:
+        authorization = self.headers.get("Authorization", "")
+        return authorization.rpartition("mock.")[2]
+
+    def _send_page(self, items: list, query: dict, path: str) -> None:
+        page_size = self.server.estate.spec.page_size
+        skip = int(query.get("$skiptoken", 0))
+        body = {"value": items[skip : skip + page_size]}
+
+        if skip + page_size < len(items):
+            next_query = {**query, "$skiptoken": str(skip + page_size)}
+            body["nextLink"] = (
+                f"{self.server.base_url}{path}?{urllib.parse.urlencode(next_query)}"
+            )
+        self._send_json(body)
+
+    def _send_json(self, body: dict, status: int = 200) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_mock_command(self, method: str, path: str) -> None:
+        if path == "/_mock/stats":
+            return self._send_json(self.server.get_stats())
+        if path == "/_mock/reset" and method == "POST":
+            self.server.reset_stats()
+            return self._send_json({})
+        self._send_json({"error": {"code": "NotFound", "message": path}}, 404)
+
+
+_BILLING_ACCOUNT = (
+    r"/providers/Microsoft\.Billing/billingAccounts/(?P<billing_account_id>[^/]+)"
+)
+
+_ROUTES = [
+    (
+        "openid_configuration",
+        r"/(?P<tenant_id>[^/]+)/v2\.0/\.well-known/openid-configuration",
+        ("GET",),
+        _MockAzureHandler._openid_configuration,
+    ),
+    (
+        "token",
+        r"/(?P<tenant_id>[^/]+)/oauth2/v2\.0/token",
+        ("POST",),
+        _MockAzureHandler._token,
+    ),
+    (
+        "billing_accounts",
+        r"/providers/Microsoft\.Billing/billingAccounts",
+        ("GET",),
+        _MockAzureHandler._billing_accounts,
+    ),
+    (
+        "departments",
+        rf"{_BILLING_ACCOUNT}/departments",
+        ("GET",),
+        _MockAzureHandler._departments,
+    ),
+    (
+        "department_subscriptions",
+        rf"{_BILLING_ACCOUNT}/departments/(?P<department_id>[^/]+)/billingSubscriptions",
+        ("GET",),
+        _MockAzureHandler._department_subscriptions,
+    ),
+    (
+        "billing_subscriptions",
+        rf"{_BILLING_ACCOUNT}/billingSubscriptions",
+        ("GET",),
+        _MockAzureHandler._billing_subscriptions,
+    ),
+    ("tenants", r"/tenants", ("GET",), _MockAzureHandler._tenants),
+    ("subscriptions", r"/subscriptions", ("GET",), _MockAzureHandler._subscriptions),
+    (
+        "subscription",
+        r"/subscriptions/(?P<subscription_id>[^/]+)",
+        ("GET",),
+        _MockAzureHandler._subscription,
+    ),
+    (
+        "entities",
+        r"/providers/Microsoft\.Management/getEntities",
+        ("GET", "POST"),
+        _MockAzureHandler._entities,
+    ),
+]
+
+
+class _MockAzureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, estate: Estate, latency: float, cert_files: tuple):
+        super().__init__(("127.0.0.1", 0), _MockAzureHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*cert_files)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+
+        self.estate = estate
+        self.latency = latency
+        self.base_url = f"https://localhost:{self.server_address[1]}"
+        self.routes = [
+            (route, re.compile(pattern), methods, handler)
+            for route, pattern, methods, handler in _ROUTES
+        ]
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self._counts.values()),
+                "routes": dict(self._counts),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+def _serve(
+    spec: dict, latency: float, cert_files: tuple, ready: multiprocessing.Queue
+) -> None:
+    server = _MockAzureHTTPServer(Estate(EstateSpec(**spec)), latency, cert_files)
+    ready.put(server.base_url)
+    server.serve_forever()
+
+
+class MockAzureServer:
+    """Runs the mock for an EstateSpec in a child process.
+
+    `latency` adds that many seconds to every ARM and AAD response, to make the
+    effect of concurrency visible on a local machine.
+    """
+
+    def __init__(self, spec: EstateSpec, latency: float = 0.0):
+        self.spec = spec
+        self.estate = Estate(spec)
+        self.latency = latency
+        self.base_url = None
+        self._process = None
+        self._cert_dir = None
+        self._ssl_context = None
+        self._previous_environ = {}
+
+    def start(self) -> str:
+        self._cert_dir = tempfile.TemporaryDirectory(prefix="mock-azure-")
+        cert_files = _create_certificate(self._cert_dir.name)
+        self._ssl_context = ssl.create_default_context(cafile=cert_files[0])
+        self._previous_environ = {key: os.environ.get(key) for key in CA_ENVIRON_KEYS}
+        os.environ.update({key: cert_files[0] for key in CA_ENVIRON_KEYS})
+
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(
+            target=_serve,
+            args=(self.spec.to_dict(), self.latency, cert_files, ready),
+            daemon=True,
+        )
+        self._process.start()
+        self.base_url = ready.get(timeout=60)
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+        for key, value in self._previous_environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._previous_environ = {}
+
+        if self._cert_dir is not None:
+            self._cert_dir.cleanup()
+            self._cert_dir = None
+
+    def get_stats(self) -> dict:
+        with urllib.request.urlopen(
+            f"{self.base_url}/_mock/stats", context=self._ssl_context
+        ) as response:
+            return json.loads(response.read())
+
+    def reset_stats(self) -> None:
+        request = urllib.request.Request(f"{self.base_url}/_mock/reset", method="POST")
+        with urllib.request.urlopen(request, context=self._ssl_context):
+            pass
+
+    def __enter__(self) -> "MockAzureServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
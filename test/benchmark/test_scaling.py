@@ -0,0 +1,99 @@
+"""Scaling regression benchmark of the Unknown agreement sync.
+
+Subscriptions are listed once for all tenants and grouped by tenant, so the
+requests grow with the subscription pages and the tenants, not with their
+product, and every subscription is converted once. The sync runs end to end
+against the mock server at two estate sizes.
+"""
+
+import math
+
+import pytest
+from spaceone.core import config
+
+from harness import (
+    EstateSpec,
+    MockAzureServer,
+    configure_plugin,
+    reset_plugin_state,
+    run_sync,
+)
+from plugin.lib.converter import model_converter
+
+PAGE_SIZE = 100
+# (tenants, subscriptions)
+SIZES = [(5, 200), (20, 800)]
+
+
+@pytest.fixture(scope="module")
+def reports() -> dict:
+    global_conf = {
+        "THROTTLING": {"requests_per_second": 10000, "burst": 10000},
+        "LOG": {"loggers": {"spaceone": {"level": "WARNING"}}},
+    }
+    previous_conf = {
+        key: config.get_global(key) for key in ("AZURE_CLOUD", *global_conf)
+    }
+
+    conversions = []
+    convert = model_converter.convert
+
+    def count_conversions(*args, **kwargs):
+        conversions.append(None)
+        return convert(*args, **kwargs)
+
+    reports = {}
+    try:
+        for tenants, subscriptions in SIZES:
+            spec = EstateSpec(
+                agreement_type="Unknown",
+                tenants=tenants,
+                subscriptions=subscriptions,
+                page_size=PAGE_SIZE,
+            )
+            with MockAzureServer(spec) as mock, pytest.MonkeyPatch.context() as mp:
+                configure_plugin(mock, **global_conf)
+                mp.setattr(model_converter, "convert", count_conversions)
+                conversions.clear()
+                report = run_sync(mock)
+                report["conversions"] = len(conversions)
+                reports[(tenants, subscriptions)] = report
+    finally:
+        config.set_global(**previous_conf)
+        reset_plugin_state()
+
+    return reports
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_every_subscription_is_collected(reports, size):
+    report = reports[size]
+
+    assert report["results"] == report["expected_results"]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_subscriptions_are_listed_once(reports, size):
+    tenants, subscriptions = size
+    routes = reports[size]["requests"]["routes"]
+
+    assert routes["tenants"] == 1
+    assert routes["subscriptions"] == math.ceil(subscriptions / PAGE_SIZE)
+    # one management group crawl per tenant, each fitting in one page
+    assert routes["entities"] == tenants
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_each_subscription_is_converted_once(reports, size):
+    _, subscriptions = size
+
+    # once from the subscription listing, once from its management group entity
+    assert reports[size]["conversions"] == 2 * subscriptions
+
+
+def test_requests_grow_linearly(reports):
+    (small_tenants, _), (large_tenants, _) = SIZES
+    small, large = reports[SIZES[0]], reports[SIZES[1]]
+    scale = large_tenants / small_tenants
+
+    assert large["requests"]["requests"] <= scale * small["requests"]["requests"]
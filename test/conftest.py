@@ -0,0 +1,17 @@
+import os
+import sys
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from spaceone.core import config  # noqa: E402
+
+
+def pytest_configure():
+    # load plugin/conf/global_conf.py, as the plugin server does on start
+    if config.get_global("PACKAGE") != "plugin":
+        config.init_conf(package="plugin")
+        config.set_service_config()
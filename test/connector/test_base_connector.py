@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from plugin.connector.aio.base import AsyncAzureBaseConnector
+from plugin.connector.base import AzureBaseConnector
+
+QUERY = {"select": "Name,Type", "view": "SubscriptionsOnly"}
+ENTITIES = ["mg-root", "sub-1", "sub-2"]
+
+
+def make_error(status_code: int) -> HttpResponseError:
+    error = HttpResponseError(message=f"status {status_code}")
+    error.status_code = status_code
+    return error
+
+
+class FakeList:
+    """Lists ENTITIES and records the query of every call.
+
+    With a query, it raises error after yielding fail_after items.
+    """
+
+    def __init__(self, error: HttpResponseError, fail_after: int = 0):
+        self.error = error
+        self.fail_after = fail_after
+        self.queries = []
+
+    def __call__(self, **query):
+        self.queries.append(query)
+        for index, entity in enumerate(ENTITIES):
+            if query and index == self.fail_after:
+                raise self.error
+            yield entity
+
+    def call_async(self, **query):
+        async def list_async():
+            for entity in self(**query):
+                yield entity
+
+        return list_async()
+
+
+def collect_async(list_func, **query) -> list:
+    async def collect():
+        return [
+            item
+            async for item in AsyncAzureBaseConnector._list_with_query(
+                list_func, **query
+            )
+        ]
+
+    return asyncio.run(collect())
+
+
+def test_query_is_pushed_and_none_values_are_dropped():
+    list_func = FakeList(make_error(400), fail_after=len(ENTITIES))
+
+    items = list(AzureBaseConnector._list_with_query(list_func, **QUERY, search=None))
+
+    assert items == ENTITIES
+    assert list_func.queries == [QUERY]
+
+
+def test_rejected_query_is_retried_without_it():
+    list_func = FakeList(make_error(400))
+
+    items = list(AzureBaseConnector._list_with_query(list_func, **QUERY))
+
+    assert items == ENTITIES
+    assert list_func.queries == [QUERY, {}]
+
+
+def test_rejected_query_is_retried_without_it_async():
+    list_func = FakeList(make_error(400))
+
+    items = collect_async(list_func.call_async, **QUERY)
+
+    assert items == ENTITIES
+    assert list_func.queries == [QUERY, {}]
+
+
+@pytest.mark.parametrize("status_code, fail_after", [(400, 1), (500, 0)])
+def test_error_after_items_or_other_status_is_raised(status_code, fail_after):
+    list_func = FakeList(make_error(status_code), fail_after)
+
+    items = []
+    with pytest.raises(HttpResponseError):
+        for item in AzureBaseConnector._list_with_query(list_func, **QUERY):
+            items.append(item)
+
+    # the items already yielded are not listed a second time
+    assert items == ENTITIES[:fail_after]
+    assert list_func.queries == [QUERY]
+
+
+@pytest.mark.parametrize("status_code, fail_after", [(400, 1), (500, 0)])
+def test_error_after_items_or_other_status_is_raised_async(status_code, fail_after):
+    list_func = FakeList(make_error(status_code), fail_after)
+
+    with pytest.raises(HttpResponseError):
+        collect_async(list_func.call_async, **QUERY)
+
+    assert list_func.queries == [QUERY]
@@ -0,0 +1,63 @@
+import pytest
+from spaceone.core import config
+
+from plugin.connector.client_registry import ClientRegistry
+
+SECRET_DATA = {
+    "tenant_id": "tenant-a",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+    "subscription_id": "subscription-a",
+}
+
+
+def make_registry(**conf) -> ClientRegistry:
+    return ClientRegistry({"idle_timeout": 600, "max_size": 100, **conf})
+
+
+@pytest.fixture
+def usgov_cloud():
+    azure_cloud_conf = config.get_global("AZURE_CLOUD")
+    config.set_global(
+        AZURE_CLOUD={
+            "resource_manager_endpoint": "https://management.usgovcloudapi.net",
+            "authority_host": "https://login.microsoftonline.us",
+        }
+    )
+    yield
+    config.set_global(AZURE_CLOUD=azure_cloud_conf)
+
+
+def test_clients_are_reused_per_tenant_client_and_subscription():
+    registry = make_registry()
+
+    clients = registry.get_clients(SECRET_DATA)
+    assert registry.get_clients(dict(SECRET_DATA)) is clients
+    assert registry.get_clients({**SECRET_DATA, "tenant_id": "tenant-b"}) is not clients
+    assert (
+        registry.get_clients({**SECRET_DATA, "subscription_id": "subscription-b"})
+        is not clients
+    )
+    assert (
+        registry.get_clients({**SECRET_DATA, "client_secret": "other"}) is not clients
+    )
+    assert len(registry) == 4
+
+
+def test_sdk_clients_are_created_once():
+    clients = make_registry().get_clients(SECRET_DATA)
+
+    assert clients.subscription_client is clients.subscription_client
+    assert clients.management_groups_client is clients.management_groups_client
+
+
+def test_sdk_clients_use_the_configured_cloud(usgov_cloud):
+    clients = make_registry().get_clients(SECRET_DATA)
+    subscription_client = clients.subscription_client
+
+    assert subscription_client._config.credential_scopes == [
+        "https://management.usgovcloudapi.net/.default"
+    ]
+    assert subscription_client._client._base_url == (
+        "https://management.usgovcloudapi.net"
+    )
@@ -0,0 +1,72 @@
+import email.utils
+import time
+
+from plugin.connector.throttling import RequestBudget, RetryConfig
+
+THROTTLING_CONF = {
+    "retry_total": 5,
+    "retry_backoff_factor": 1.0,
+    "retry_backoff_max": 8,
+    "requests_per_second": 10,
+    "burst": 3,
+    "low_remaining_threshold": 10,
+    "low_remaining_delay": 0.2,
+}
+
+
+def test_retry_after_is_honored_as_given():
+    retry_config = RetryConfig(THROTTLING_CONF)
+
+    assert retry_config.get_delay(0, {"Retry-After": "0"}) == 0
+    # longer than retry_backoff_max, still honored
+    assert retry_config.get_delay(0, {"Retry-After": "120"}) == 120
+
+    retry_at = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < retry_config.get_delay(0, {"Retry-After": retry_at}) <= 30
+
+
+def test_computed_backoff_is_capped():
+    retry_config = RetryConfig(THROTTLING_CONF)
+
+    for attempt in range(10):
+        assert 0 <= retry_config.get_delay(attempt) <= 8
+    assert 0 <= retry_config.get_delay(10, {"Retry-After": "invalid"}) <= 8
+
+
+def test_budget_allows_a_burst_then_throttles():
+    budget = RequestBudget(THROTTLING_CONF)
+
+    assert [budget._try_acquire("tenant-a") for _ in range(3)] == [0, 0, 0]
+    wait = budget._try_acquire("tenant-a")
+    assert 0 < wait <= 0.1
+
+    # tenants have their own budget
+    assert budget._try_acquire("tenant-b") == 0
+
+
+def test_acquire_waits_for_the_budget_to_refill():
+    budget = RequestBudget(THROTTLING_CONF)
+
+    started_at = time.monotonic()
+    for _ in range(5):
+        budget.acquire("tenant-a")
+
+    # 3 from the burst, then 2 at 10 requests per second
+    assert time.monotonic() - started_at >= 0.15
+
+
+def test_low_ratelimit_remaining_holds_the_tenant_back():
+    budget = RequestBudget(THROTTLING_CONF)
+
+    budget.observe("tenant-a", {"x-ms-ratelimit-remaining-tenant-reads": "11999"})
+    assert budget._try_acquire("tenant-a") == 0
+
+    budget.observe(
+        "tenant-a",
+        {
+            "x-ms-ratelimit-remaining-tenant-reads": "11999",
+            "x-ms-ratelimit-remaining-subscription-reads": "5",
+        },
+    )
+    assert 0.1 < budget._try_acquire("tenant-a") <= 0.2
+    assert budget._try_acquire("tenant-b") == 0
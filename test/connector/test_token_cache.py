@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+from azure.core.credentials import AccessToken
+
+from plugin.connector.token_cache import CachedTokenCredential, TokenCache
+
+SECRET_DATA = {
+    "tenant_id": "tenant-a",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+}
+SCOPE = "https://management.azure.com/.default"
+
+
+class FakeClientSecretCredential:
+    instances = []
+
+    def __init__(self, tenant_id, client_id, client_secret, **kwargs):
+        self.tenant_id = tenant_id
+        self.calls = 0
+        self.expires_in = 3600
+        self.delay = 0
+        self.instances.append(self)
+
+    def get_token(self, *scopes, **kwargs):
+        time.sleep(self.delay)
+        self.calls += 1
+        return AccessToken(
+            f"{self.tenant_id}.{self.calls}", int(time.time()) + self.expires_in
+        )
+
+
+@pytest.fixture(autouse=True)
+def fake_credential(monkeypatch):
+    FakeClientSecretCredential.instances = []
+    monkeypatch.setattr(
+        "azure.identity.ClientSecretCredential", FakeClientSecretCredential
+    )
+
+
+def make_cache(**conf) -> TokenCache:
+    return TokenCache(
+        {"refresh_margin": 300, "idle_timeout": 600, "max_size": 100, **conf}
+    )
+
+
+def test_token_is_reused_until_refresh_margin():
+    cache = make_cache()
+
+    assert cache.get_token(SECRET_DATA, SCOPE) == "tenant-a.1"
+    assert cache.get_token(SECRET_DATA, SCOPE) == "tenant-a.1"
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_token_expiring_within_refresh_margin_is_refreshed():
+    cache = make_cache()
+    cache.get_client_secret_credential(SECRET_DATA).expires_in = 60
+
+    assert cache.get_token(SECRET_DATA, SCOPE) == "tenant-a.1"
+    assert cache.get_token(SECRET_DATA, SCOPE) == "tenant-a.2"
+
+
+def test_concurrent_callers_share_one_refresh():
+    cache = make_cache()
+    credential = cache.get_client_secret_credential(SECRET_DATA)
+    credential.delay = 0.1
+
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(cache.get_token(SECRET_DATA)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert credential.calls == 1
+    assert set(tokens) == {"tenant-a.1"}
+
+
+def test_secret_is_part_of_the_key():
+    cache = make_cache()
+
+    cache.get_token(SECRET_DATA, SCOPE)
+    cache.get_token({**SECRET_DATA, "client_secret": "other"}, SCOPE)
+
+    assert len(cache) == 2
+    assert len(FakeClientSecretCredential.instances) == 2
+
+
+def test_cached_token_credential_follows_the_requested_tenant():
+    cache = make_cache()
+    credential = CachedTokenCredential(cache, SECRET_DATA)
+
+    assert credential.get_token(SCOPE).token == "tenant-a.1"
+    assert credential.get_token(SCOPE, tenant_id="tenant-b").token == "tenant-b.1"
+    assert credential.get_token(SCOPE).token == "tenant-a.1"
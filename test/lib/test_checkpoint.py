@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from spaceone.core import config
+
+from plugin.lib.checkpoint import (
+    SyncCheckpoint,
+    checkpoint_scope,
+    checkpoint_sync,
+    get_checkpoint,
+)
+from plugin.lib.state_store import SyncStateStore
+
+SECRET_DATA = {"tenant_id": "tenant-a", "client_id": "client-a"}
+
+
+@pytest.fixture
+def store(tmp_path) -> SyncStateStore:
+    return SyncStateStore(str(tmp_path / "state.db"))
+
+
+@pytest.fixture
+def checkpoint_conf(tmp_path):
+    checkpoint_conf = config.get_global("CHECKPOINT")
+    config.set_global(
+        CHECKPOINT={
+            "enabled": True,
+            "path": str(tmp_path / "checkpoint.db"),
+            "max_age": 3600,
+        }
+    )
+    yield config.get_global("CHECKPOINT")
+    config.set_global(CHECKPOINT=checkpoint_conf)
+
+
+def test_entries_are_resumed_by_the_next_sync(store):
+    SyncCheckpoint(store, "scope", 3600).set("page:1", {"value": [1]})
+
+    checkpoint = SyncCheckpoint(store, "scope", 3600)
+    assert checkpoint.get("page:1") == {"value": [1]}
+    assert checkpoint.get("page:2") is None
+    assert checkpoint.resumed == 1
+
+
+def test_entries_older_than_max_age_are_not_resumed(store):
+    SyncCheckpoint(store, "scope", 3600).set("page:1", {"value": [1]})
+    time.sleep(0.05)
+
+    assert SyncCheckpoint(store, "scope", 0.01).get("page:1") is None
+
+
+def test_children_are_cleared_independently(store):
+    checkpoint = SyncCheckpoint(store, "scope", 3600)
+    checkpoint.child("billing-account-1").set("tenant:a", [{}, {}])
+    checkpoint.child("billing-account-2").set("tenant:b", [{}, {}])
+
+    checkpoint.child("billing-account-1").clear()
+
+    checkpoint = SyncCheckpoint(store, "scope", 3600)
+    assert checkpoint.child("billing-account-1").get("tenant:a") is None
+    assert checkpoint.child("billing-account-2").get("tenant:b") == [{}, {}]
+
+
+def test_checkpoint_sync_is_disabled_by_default():
+    with checkpoint_sync("domain-a", SECRET_DATA) as checkpoint:
+        assert checkpoint is None
+        with checkpoint_scope("billing-account-1") as child:
+            assert child is None
+
+
+def test_checkpoint_scope_makes_the_child_current(checkpoint_conf):
+    with checkpoint_sync("domain-a", SECRET_DATA) as checkpoint:
+        with checkpoint_scope("billing-account-1") as child:
+            assert get_checkpoint() is child
+            assert child.scope == f"{checkpoint.scope}/billing-account-1"
+        assert get_checkpoint() is checkpoint
+
+    assert get_checkpoint() is None
+
+
+def test_checkpoint_sync_prunes_expired_entries(checkpoint_conf):
+    store = SyncStateStore(checkpoint_conf["path"])
+    store.save_checkpoint("other-scope", "page:1", {})
+    store.save_checkpoint("other-scope", "page:2", {})
+    with store._connect() as conn:
+        conn.execute("UPDATE checkpoint SET updated_at = 0 WHERE key = 'page:1'")
+
+    with checkpoint_sync("domain-a", SECRET_DATA):
+        pass
+
+    assert store.load_checkpoint("other-scope", 0) == {"page:2": {}}
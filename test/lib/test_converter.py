@@ -0,0 +1,75 @@
+from azure.mgmt.resource.subscriptions.models import (
+    ManagedByTenant,
+    Subscription,
+    SubscriptionState,
+)
+
+from plugin.lib.converter import ModelConverter
+
+
+def make_subscription() -> Subscription:
+    subscription = Subscription(
+        tags={"env": "prod"},
+        managed_by_tenants=[ManagedByTenant()],
+    )
+    # read-only attributes are only set by the deserializer
+    subscription.subscription_id = "00000000-0000-0000-0000-000000000001"
+    subscription.display_name = "prod"
+    subscription.state = SubscriptionState.ENABLED
+    return subscription
+
+
+def test_sdk_models_are_converted_to_plain_values():
+    converted = ModelConverter().convert(make_subscription())
+
+    assert converted["subscription_id"] == "00000000-0000-0000-0000-000000000001"
+    assert converted["state"] == "Enabled"
+    assert converted["tags"] == {"env": "prod"}
+    assert converted["managed_by_tenants"] == [
+        {"tenant_id": None, "additional_properties": {}}
+    ]
+
+
+def test_fields_limit_the_top_level_keys():
+    converted = ModelConverter().convert(
+        make_subscription(), ("subscription_id", "tags", "missing")
+    )
+
+    assert converted == {
+        "subscription_id": "00000000-0000-0000-0000-000000000001",
+        "tags": {"env": "prod"},
+        "missing": None,
+    }
+    assert ModelConverter().convert({"a": 1, "b": 2}, ("a", "missing")) == {"a": 1}
+
+
+def test_input_is_not_modified():
+    subscription = make_subscription()
+    value = {"subscription": subscription, "items": [subscription]}
+
+    converted = ModelConverter().convert(value)
+
+    assert isinstance(value["subscription"], Subscription)
+    assert value["items"][0] is subscription
+    assert subscription.state is SubscriptionState.ENABLED
+    assert converted["items"][0]["state"] == "Enabled"
+
+
+def test_cycles_are_cut():
+    class Node:
+        def __init__(self):
+            self.name = "node"
+            self.parent = None
+
+    node = Node()
+    node.parent = node
+
+    assert ModelConverter().convert(node) == {"name": "node", "parent": None}
+
+
+def test_field_plans_are_cached_per_model_type():
+    converter = ModelConverter()
+    converter.convert(make_subscription())
+    converter.convert(make_subscription())
+
+    assert list(converter._field_plans) == [Subscription, ManagedByTenant]
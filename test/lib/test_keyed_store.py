@@ -0,0 +1,55 @@
+import time
+
+from plugin.lib.keyed_store import KeyedStore, make_secret_key
+
+SECRET_DATA = {
+    "tenant_id": "tenant-a",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+    "subscription_id": "subscription-a",
+}
+CONF = {"idle_timeout": 600, "max_size": 100}
+
+
+def test_values_are_created_once():
+    store = KeyedStore("test")
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    value = store.get(("tenant-a",), factory, CONF)
+
+    assert store.get(("tenant-a",), factory, CONF) is value
+    assert len(created) == 1
+    assert len(store) == 1
+
+
+def test_least_recently_used_values_are_evicted():
+    store = KeyedStore("test")
+
+    for tenant_id in ("tenant-a", "tenant-b", "tenant-a", "tenant-c"):
+        store.get((tenant_id,), object, {**CONF, "max_size": 2})
+
+    assert store.keys() == [("tenant-a",), ("tenant-c",)]
+
+
+def test_idle_values_are_evicted():
+    store = KeyedStore("test")
+    conf = {**CONF, "idle_timeout": 0.05}
+
+    store.get(("tenant-a",), object, conf)
+    time.sleep(0.1)
+    store.get(("tenant-b",), object, conf)
+
+    assert store.keys() == [("tenant-b",)]
+
+
+def test_secret_key_hashes_the_secret_and_keeps_the_fields():
+    key = make_secret_key(SECRET_DATA, "subscription_id")
+
+    assert key[:3] == ("tenant-a", "client-a", "subscription-a")
+    assert "secret-a" not in key
+    assert key != make_secret_key({**SECRET_DATA, "client_secret": "other"})
+    assert make_secret_key(SECRET_DATA, "missing")[2] == ""
@@ -0,0 +1,72 @@
+import time
+
+from plugin.lib.location_map_cache import LocationMapCache
+
+LOCATION_MAP = {"sub-1": [{"name": "Prod", "resource_id": "mg-prod"}]}
+
+
+def make_cache(**conf) -> LocationMapCache:
+    return LocationMapCache({"ttl": 3600, "max_size": 100, "path": None, **conf})
+
+
+def test_location_maps_are_cached_until_ttl():
+    cache = make_cache(ttl=0.05)
+
+    assert cache.get("tenant-a") is None
+    cache.set("tenant-a", LOCATION_MAP)
+    assert cache.get("tenant-a") == LOCATION_MAP
+
+    time.sleep(0.1)
+    assert cache.get("tenant-a") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = make_cache(ttl=0)
+
+    cache.set("tenant-a", LOCATION_MAP)
+    assert cache.get("tenant-a") is None
+
+
+def test_least_recently_used_maps_are_evicted():
+    cache = make_cache(max_size=2)
+
+    cache.set("tenant-a", LOCATION_MAP)
+    cache.set("tenant-b", LOCATION_MAP)
+    cache.get("tenant-a")
+    cache.set("tenant-c", LOCATION_MAP)
+
+    assert cache.get("tenant-b") is None
+    assert cache.get("tenant-a") == LOCATION_MAP
+    assert cache.get("tenant-c") == LOCATION_MAP
+
+
+def test_cache_survives_restarts_through_its_file(tmp_path):
+    path = str(tmp_path / "location_maps.json")
+    make_cache(path=path).set("tenant-a", LOCATION_MAP)
+
+    assert make_cache(path=path).get("tenant-a") == LOCATION_MAP
+
+    # expired entries are not loaded
+    make_cache(path=path, ttl=0.05).set("tenant-b", LOCATION_MAP)
+    time.sleep(0.1)
+    cache = make_cache(path=path)
+    assert cache.get("tenant-b") is None
+    assert cache.get("tenant-a") == LOCATION_MAP
+
+    # a broken file is ignored
+    (tmp_path / "location_maps.json").write_text("not json")
+    assert make_cache(path=path).get("tenant-a") is None
+
+
+def test_key_depends_on_client_and_location_options():
+    secret_data = {"client_id": "client-a"}
+
+    key = LocationMapCache.make_key(secret_data, "tenant-a", {})
+    assert key == LocationMapCache.make_key(
+        secret_data, "tenant-a", {"exclude_root_management_group": False}
+    )
+    assert key != LocationMapCache.make_key(
+        secret_data, "tenant-a", {"exclude_root_management_group": True}
+    )
+    assert key != LocationMapCache.make_key({"client_id": "client-b"}, "tenant-a", {})
@@ -0,0 +1,56 @@
+from plugin.lib.management_group_tree import ManagementGroupTree
+
+ROOT = ("tenant-a", "Tenant Root Group")
+PLATFORM = ("mg-platform", "Platform ")
+PROD = ("mg-prod", "Prod")
+
+
+def add_subscription(tree: ManagementGroupTree, subscription_id: str, *groups):
+    # the entities API lists the parent chain from the root down
+    tree.add_subscription(
+        subscription_id,
+        [resource_id for resource_id, _ in groups],
+        [name for _, name in groups],
+    )
+
+
+def test_location_lists_groups_from_the_root_down():
+    tree = ManagementGroupTree()
+    add_subscription(tree, "sub-1", ROOT, PLATFORM, PROD)
+
+    assert tree.get_location("sub-1") == (
+        {"name": "Tenant Root Group", "resource_id": "tenant-a"},
+        {"name": "Platform", "resource_id": "mg-platform"},
+        {"name": "Prod", "resource_id": "mg-prod"},
+    )
+
+
+def test_root_group_can_be_excluded():
+    tree = ManagementGroupTree(exclude_root=True)
+    add_subscription(tree, "sub-1", ROOT, PLATFORM)
+
+    assert tree.get_location("sub-1") == (
+        {"name": "Platform", "resource_id": "mg-platform"},
+    )
+
+
+def test_groups_are_interned_and_shared():
+    tree = ManagementGroupTree()
+    add_subscription(tree, "sub-1", ROOT, PLATFORM, PROD)
+    add_subscription(tree, "sub-2", ROOT, PLATFORM, PROD)
+    add_subscription(tree, "sub-3", ROOT, PLATFORM)
+
+    assert len(tree) == 3
+    assert tree.get_location("sub-1") is tree.get_location("sub-2")
+    # a parent's location is the prefix of its children's
+    assert tree.get_location("sub-1")[:2] == tree.get_location("sub-3")
+    assert tree.get_location("sub-1")[1] is tree.get_location("sub-3")[1]
+
+
+def test_subscriptions_without_groups():
+    tree = ManagementGroupTree()
+    add_subscription(tree, "sub-1")
+
+    assert tree.get_location("sub-1") == ()
+    assert tree.get_location("unknown") is None
+    assert tree.to_location_map() == {"sub-1": ()}
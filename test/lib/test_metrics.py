@@ -0,0 +1,89 @@
+import asyncio
+
+from plugin.lib.metrics import collect_metrics, count, get_metrics, span
+from plugin.manager.base import AzureBaseManager
+
+
+def test_spans_with_the_same_name_are_aggregated():
+    with collect_metrics() as metrics:
+        for _ in range(3):
+            with span("list_subscriptions"):
+                pass
+        count("tenant-a", "subscriptions", 2)
+        count("tenant-a", "subscriptions")
+
+    summary = metrics.summary()
+    assert summary["spans"]["list_subscriptions"]["calls"] == 3
+    assert summary["tenants"] == {"tenant-a": {"subscriptions": 3}}
+
+
+def test_nothing_is_collected_outside_a_sync():
+    with span("list_subscriptions"):
+        count("tenant-a", "subscriptions")
+
+    assert get_metrics() is None
+
+
+def test_nested_collection_uses_the_enclosing_metrics():
+    with collect_metrics() as outer:
+        with collect_metrics() as inner:
+            with span("sync"):
+                pass
+
+    assert inner is outer
+    assert get_metrics() is None
+    assert outer.summary()["spans"]["sync"]["calls"] == 1
+
+
+def test_run_concurrently_workers_inherit_the_metrics():
+    def func(tenant_id):
+        with span("get_token"):
+            count(tenant_id, "requests")
+        return get_metrics()
+
+    with collect_metrics() as metrics:
+        outcomes = list(
+            AzureBaseManager.run_concurrently(func, ["tenant-a", "tenant-b"], 2)
+        )
+
+    assert [result for _, result, _ in outcomes] == [metrics, metrics]
+    summary = metrics.summary()
+    assert summary["spans"]["get_token"]["calls"] == 2
+    assert summary["tenants"] == {
+        "tenant-a": {"requests": 1},
+        "tenant-b": {"requests": 1},
+    }
+
+
+def test_stream_concurrently_workers_inherit_the_metrics():
+    def func(tenant_id):
+        for _ in range(3):
+            count(tenant_id, "subscriptions")
+            yield get_metrics()
+
+    with collect_metrics() as metrics:
+        streamed = [
+            list(values)
+            for _, values in AzureBaseManager.stream_concurrently(
+                func, ["tenant-a", "tenant-b"], 2
+            )
+        ]
+
+    assert streamed == [[metrics] * 3, [metrics] * 3]
+    assert metrics.summary()["tenants"] == {
+        "tenant-a": {"subscriptions": 3},
+        "tenant-b": {"subscriptions": 3},
+    }
+
+
+def test_asyncio_tasks_inherit_the_metrics():
+    async def sync_tenant(tenant_id):
+        count(tenant_id, "requests")
+
+    async def sync_tenants():
+        await asyncio.gather(*(sync_tenant(tenant) for tenant in ("a", "b")))
+
+    with collect_metrics() as metrics:
+        asyncio.run(sync_tenants())
+
+    assert metrics.summary()["tenants"] == {"a": {"requests": 1}, "b": {"requests": 1}}
@@ -0,0 +1,49 @@
+import json
+
+from plugin.lib.payload import loads, project
+
+DEPARTMENT = {
+    "id": "/providers/Microsoft.Billing/departments/dept-1",
+    "name": "dept-1",
+    "properties": {
+        "departmentName": "Department 1",
+        "costCenter": "cc-1",
+        "enrollmentAccounts": [{"id": "ea-1"}],
+    },
+}
+
+
+def test_nested_keys_are_projected():
+    projection = {"name": None, "properties": {"departmentName": None}}
+
+    assert project(DEPARTMENT, projection) == {
+        "name": "dept-1",
+        "properties": {"departmentName": "Department 1"},
+    }
+
+
+def test_keys_missing_from_the_value_are_left_out():
+    projection = {"name": None, "etag": None, "properties": {"status": None}}
+
+    assert project(DEPARTMENT, projection) == {"name": "dept-1", "properties": {}}
+
+
+def test_non_dict_values_are_kept_as_they_are():
+    projection = {"properties": {"enrollmentAccounts": {"id": None}}}
+
+    assert project(DEPARTMENT, projection) == {
+        "properties": {"enrollmentAccounts": [{"id": "ea-1"}]}
+    }
+    assert project("dept-1", projection) == "dept-1"
+    assert project(None, projection) is None
+
+
+def test_no_projection_keeps_the_whole_value():
+    assert project(DEPARTMENT, None) is DEPARTMENT
+
+
+def test_loads_decodes_bytes_and_str():
+    data = json.dumps(DEPARTMENT)
+
+    assert loads(data) == DEPARTMENT
+    assert loads(data.encode("utf-8")) == DEPARTMENT
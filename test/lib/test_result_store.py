@@ -0,0 +1,71 @@
+from plugin.lib.result_store import ResultStore
+
+
+def make_result(subscription_id: str, name: str, **fields) -> dict:
+    return {
+        "name": name,
+        "data": {"subscription_id": subscription_id, "tenant_id": "tenant-a"},
+        "resource_id": subscription_id,
+        "tags": {},
+        "location": [],
+        **fields,
+    }
+
+
+SECRET_FIELDS = {
+    "secret_schema_id": "azure-secret-multi-tenant",
+    "secret_data": {"subscription_id": "sub-1", "tenant_id": "tenant-a"},
+}
+
+
+def test_one_result_per_subscription_in_first_seen_order():
+    store = ResultStore()
+    store.extend([make_result("sub-1", "a"), make_result("sub-2", "b")], "Unknown")
+    store.add(make_result("SUB-1", "c"), "Unknown")
+
+    assert [result["name"] for result in store.results()] == ["a", "b"]
+    assert len(store) == 2
+
+
+def test_billing_agreements_take_precedence_over_the_subscription_listing():
+    store = ResultStore()
+    store.add(
+        make_result("sub-1", "listed", tags={"env": "dev", "owner": "x"}),
+        "Unknown",
+    )
+    store.add(
+        make_result(
+            "sub-1",
+            "billed",
+            tags={"env": "prod"},
+            location=[{"name": "Dept", "resource_id": "dept-1"}],
+        ),
+        "EnterpriseAgreement",
+    )
+    # a lower precedence result does not override what is already there
+    store.add(make_result("sub-1", "customer"), "MicrosoftPartnerAgreement")
+
+    (result,) = store.results()
+    assert result["name"] == "billed"
+    assert result["location"] == [{"name": "Dept", "resource_id": "dept-1"}]
+    assert result["tags"] == {"env": "prod", "owner": "x"}
+
+
+def test_empty_location_and_secret_are_filled_from_other_results():
+    store = ResultStore()
+    store.add(
+        make_result(
+            "sub-1",
+            "listed",
+            location=[{"name": "Home", "resource_id": "tenant-a"}],
+            **SECRET_FIELDS,
+        ),
+        "Unknown",
+    )
+    store.add(make_result("sub-1", "billed"), "EnterpriseAgreement")
+
+    (result,) = store.results()
+    assert result["name"] == "billed"
+    assert result["location"] == [{"name": "Home", "resource_id": "tenant-a"}]
+    assert result["secret_data"] == SECRET_FIELDS["secret_data"]
+    assert result["secret_schema_id"] == "azure-secret-multi-tenant"
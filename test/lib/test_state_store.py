@@ -0,0 +1,60 @@
+import pytest
+
+from plugin.lib.state_store import SyncState, SyncStateStore, make_fingerprint
+
+RESULTS = {"sub-1": {"name": "prod", "resource_id": "sub-1"}}
+
+
+@pytest.fixture
+def store(tmp_path) -> SyncStateStore:
+    return SyncStateStore(str(tmp_path / "state.db"))
+
+
+def test_unchanged_groups_reuse_their_results(store):
+    sync_state = SyncState(store, "scope", 3600)
+    assert sync_state.get_results("tenant:a", "fingerprint-1") is None
+    sync_state.set_results("tenant:a", "fingerprint-1", RESULTS)
+    sync_state.commit()
+
+    sync_state = SyncState(store, "scope", 3600)
+    assert sync_state.get_results("tenant:a", "fingerprint-1") == RESULTS
+    assert sync_state.get_results("tenant:a", "fingerprint-2") is None
+    assert (
+        SyncState(store, "other-scope", 3600).get_results("tenant:a", "fingerprint-1")
+        is None
+    )
+
+
+def test_groups_older_than_max_age_are_collected_again(store):
+    sync_state = SyncState(store, "scope", 3600)
+    sync_state.set_results("tenant:a", "fingerprint-1", RESULTS)
+    sync_state.commit()
+
+    assert (
+        SyncState(store, "scope", -1).get_results("tenant:a", "fingerprint-1") is None
+    )
+
+
+def test_groups_not_seen_again_are_removed(store):
+    sync_state = SyncState(store, "scope", 3600)
+    sync_state.set_results("tenant:a", "fingerprint-1", RESULTS)
+    sync_state.set_results("tenant:b", "fingerprint-1", RESULTS)
+    sync_state.commit()
+
+    # tenant:b is kept while a billing account failed
+    sync_state = SyncState(store, "scope", 3600)
+    sync_state.get_results("tenant:a", "fingerprint-1")
+    sync_state.commit(remove_missing=False)
+    assert set(store.load("scope")) == {"tenant:a", "tenant:b"}
+
+    sync_state = SyncState(store, "scope", 3600)
+    sync_state.get_results("tenant:a", "fingerprint-1")
+    sync_state.commit()
+    assert set(store.load("scope")) == {"tenant:a"}
+
+
+def test_fingerprint_ignores_key_order():
+    assert make_fingerprint({"a": 1, "b": [1, 2]}) == make_fingerprint(
+        {"b": [1, 2], "a": 1}
+    )
+    assert make_fingerprint({"a": 1}) != make_fingerprint({"a": 2})
@@ -0,0 +1,92 @@
+import threading
+import time
+import weakref
+
+import pytest
+
+from plugin.manager.base import AzureBaseManager
+
+
+def test_run_concurrently_keeps_order_and_reports_errors():
+    def func(item):
+        time.sleep(0.01 * (5 - item))
+        if item == 2:
+            raise ValueError(item)
+        return item * 10
+
+    outcomes = list(AzureBaseManager.run_concurrently(func, list(range(5)), 3))
+
+    assert [item for item, _, _ in outcomes] == [0, 1, 2, 3, 4]
+    assert [result for _, result, _ in outcomes] == [0, 10, None, 30, 40]
+    assert isinstance(outcomes[2][2], ValueError)
+
+
+def test_run_concurrently_releases_results_once_yielded():
+    class Result:
+        pass
+
+    outcomes = AzureBaseManager.run_concurrently(lambda item: Result(), [0, 1, 2], 2)
+
+    _, result, _ = next(outcomes)
+    released = weakref.ref(result)
+    del result
+    next(outcomes)
+    was_released = released() is None
+    list(outcomes)
+
+    assert was_released
+
+
+def test_stream_concurrently_keeps_order():
+    def func(item):
+        for value in range(3):
+            time.sleep(0.001 * (5 - item))
+            yield item, value
+
+    streamed = [
+        list(values)
+        for _, values in AzureBaseManager.stream_concurrently(func, list(range(5)), 3)
+    ]
+
+    assert streamed == [[(item, value) for value in range(3)] for item in range(5)]
+
+
+def test_stream_concurrently_bounds_items_in_flight():
+    started = []
+
+    def func(item):
+        started.append(item)
+        yield from range(100)
+
+    streams = AzureBaseManager.stream_concurrently(
+        func, list(range(10)), 3, max_buffered=5
+    )
+    _, values = next(streams)
+    next(values)
+    time.sleep(0.05)
+
+    assert sorted(started) == [0, 1, 2]
+
+    streams.close()
+    time.sleep(0.3)
+    # the workers stop once the consumer is gone
+    assert not [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.startswith("ThreadPoolExecutor")
+    ]
+
+
+def test_stream_concurrently_raises_errors_where_they_happened():
+    def func(item):
+        yield item
+        if item == 1:
+            raise ValueError(item)
+
+    streams = AzureBaseManager.stream_concurrently(func, [0, 1, 2], 2)
+    assert list(next(streams)[1]) == [0]
+
+    values = next(streams)[1]
+    assert next(values) == 1
+    with pytest.raises(ValueError):
+        next(values)
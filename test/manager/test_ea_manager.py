@@ -0,0 +1,133 @@
+import pytest
+from azure.mgmt.resource.subscriptions.models import Subscription
+
+from plugin.lib.state_store import SyncState, SyncStateStore
+from plugin.manager.ea_manager import EAManager
+
+SECRET_DATA = {
+    "tenant_id": "home-tenant",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+}
+SUBSCRIPTION_IDS = ["sub-1", "sub-2"]
+
+
+class FakeBillingConnector:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def list_departments(self, secret_data, billing_account_id, projection):
+        return [{"name": "dept-1", "properties": {"departmentName": "Department 1"}}]
+
+    def list_subscription_by_department(
+        self, options, secret_data, department_id, billing_account_id, projection
+    ):
+        for subscription_id in SUBSCRIPTION_IDS:
+            yield {
+                "properties": {
+                    "subscriptionId": subscription_id,
+                    "displayName": f"Subscription {subscription_id}",
+                    "enrollmentAccountId": "ea-1",
+                    "enrollmentAccountDisplayName": "Enrollment account 1",
+                    "enrollmentAccountSubscriptionDetails": {
+                        "subscriptionEnrollmentAccountStatus": "Active"
+                    },
+                }
+            }
+
+
+class FakeEstate:
+    """Tags of the tenant's subscriptions and their management group locations."""
+
+    def __init__(self):
+        self.tags = {
+            subscription_id: {"env": "prod"} for subscription_id in SUBSCRIPTION_IDS
+        }
+        self.locations = {
+            subscription_id: [{"name": "Prod", "resource_id": "mg-prod"}]
+            for subscription_id in SUBSCRIPTION_IDS
+        }
+        self.crawls = 0
+
+    def get_location_map(self, options, secret_data, tenant_id):
+        self.crawls += 1
+        return dict(self.locations), None
+
+    def make_subscription_connector(self, *args, **kwargs):
+        estate = self
+
+        class FakeSubscriptionConnector:
+            def get_subscription_index(self):
+                return {
+                    subscription_id: Subscription(tags=tags)
+                    for subscription_id, tags in estate.tags.items()
+                }
+
+        return FakeSubscriptionConnector()
+
+
+@pytest.fixture
+def estate(monkeypatch) -> FakeEstate:
+    estate = FakeEstate()
+    monkeypatch.setattr(
+        "plugin.manager.ea_manager.BillingConnector", FakeBillingConnector
+    )
+    monkeypatch.setattr(
+        "plugin.manager.ea_manager.SubscriptionConnector",
+        estate.make_subscription_connector,
+    )
+    return estate
+
+
+def run_incremental_sync(estate: FakeEstate, store: SyncStateStore) -> list:
+    sync_state = SyncState(store, "scope", 3600)
+    ea_mgr = EAManager(sync_state=sync_state)
+    ea_mgr.management_group_mgr.get_location_map = estate.get_location_map
+    results = list(
+        ea_mgr.sync({}, SECRET_DATA, "domain-a", billing_account_id="1234567")
+    )
+    sync_state.commit()
+    return results
+
+
+def test_results_carry_tags_and_locations(estate, tmp_path):
+    results = run_incremental_sync(estate, SyncStateStore(str(tmp_path / "state.db")))
+
+    assert [result["resource_id"] for result in results] == SUBSCRIPTION_IDS
+    assert results[0]["tags"] == {"env": "prod"}
+    assert results[0]["location"] == [
+        {"name": "Department 1", "resource_id": "dept-1"},
+        {"name": "Enrollment account 1", "resource_id": "ea-1"},
+        {"name": "Prod", "resource_id": "mg-prod"},
+    ]
+    # the tenant is crawled once per sync
+    assert estate.crawls == 1
+
+
+def test_unchanged_departments_are_reused(estate, tmp_path, monkeypatch):
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    results = run_incremental_sync(estate, store)
+
+    made_results = []
+    make_result = EAManager.make_result
+    monkeypatch.setattr(
+        EAManager,
+        "make_result",
+        staticmethod(lambda *args: made_results.append(args) or make_result(*args)),
+    )
+
+    assert run_incremental_sync(estate, store) == results
+    assert made_results == []
+
+
+def test_tag_edits_and_moves_make_their_department_collected_again(estate, tmp_path):
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    run_incremental_sync(estate, store)
+
+    estate.tags["sub-2"] = {"env": "dev"}
+    results = run_incremental_sync(estate, store)
+    assert results[1]["tags"] == {"env": "dev"}
+
+    estate.locations["sub-1"] = [{"name": "Dev", "resource_id": "mg-dev"}]
+    results = run_incremental_sync(estate, store)
+    assert results[0]["location"][-1] == {"name": "Dev", "resource_id": "mg-dev"}
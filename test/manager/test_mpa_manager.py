@@ -0,0 +1,292 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from spaceone.core import config
+
+from plugin.lib.checkpoint import checkpoint_sync, get_checkpoint
+from plugin.lib.location_map_cache import location_map_cache
+from plugin.lib.state_store import SyncState, SyncStateStore
+from plugin.manager.mpa_manager import MPAManager
+
+SECRET_DATA = {
+    "tenant_id": "partner-tenant",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+}
+CUSTOMER_TENANT_IDS = ["tenant-1", "tenant-2"]
+LOCATION = [{"name": "Prod", "resource_id": "mg-prod"}]
+
+
+class FakeBillingConnector:
+    display_names = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def list_subscription(self, options, secret_data, agreement_type, billing_id):
+        for tenant_id in CUSTOMER_TENANT_IDS:
+            yield {
+                "subscription_id": f"sub-{tenant_id}",
+                "display_name": self.display_names.get(
+                    tenant_id, f"Subscription of {tenant_id}"
+                ),
+                "subscription_billing_status": "Active",
+                "customer_id": f"/customers/{tenant_id}",
+                "customer_display_name": f"Customer {tenant_id}",
+            }
+
+
+class FakeTenantCollector:
+    """Stands in for the management group crawl and the subscription listing."""
+
+    def __init__(self):
+        self.failing_tenant_ids = set()
+        self.locations = {}
+        self.calls = []
+        # complete location maps, as the location map cache keeps them
+        self.cached_location_maps = {}
+
+    def get_location_map(self, options, secret_data, tenant_id):
+        self.calls.append(tenant_id)
+        location_map = {f"sub-{tenant_id}": self.locations.get(tenant_id, LOCATION)}
+        if tenant_id in self.failing_tenant_ids:
+            return location_map, RuntimeError("crawl failed")
+        self.cached_location_maps[tenant_id] = location_map
+        return location_map, None
+
+    def get_cached_location_map(self, options, secret_data, tenant_id):
+        return self.cached_location_maps.get(tenant_id)
+
+    def get_subscription_info_map(self, secret_data, tenant_id):
+        return {f"sub-{tenant_id}": {"subscription_id": f"sub-{tenant_id}"}}, None
+
+
+@pytest.fixture
+def tenant_collector(monkeypatch) -> FakeTenantCollector:
+    monkeypatch.setattr(
+        "plugin.manager.mpa_manager.BillingConnector", FakeBillingConnector
+    )
+    monkeypatch.setattr(FakeBillingConnector, "display_names", {})
+    return FakeTenantCollector()
+
+
+@pytest.fixture
+def checkpoint_conf(tmp_path):
+    checkpoint_conf = config.get_global("CHECKPOINT")
+    config.set_global(CHECKPOINT={"enabled": True, "path": str(tmp_path / "state.db")})
+    yield
+    config.set_global(CHECKPOINT=checkpoint_conf)
+
+
+def run_sync(tenant_collector: FakeTenantCollector, **kwargs) -> list:
+    mpa_mgr = MPAManager(**kwargs)
+    mpa_mgr.management_group_mgr = tenant_collector
+    mpa_mgr._get_subscription_info_map = tenant_collector.get_subscription_info_map
+    return list(
+        mpa_mgr.sync(
+            {}, SECRET_DATA, "domain-a", billing_account_id="billing-account-1"
+        )
+    )
+
+
+def test_results_carry_customer_and_management_group_locations(tenant_collector):
+    results = run_sync(tenant_collector)
+
+    assert [result["resource_id"] for result in results] == [
+        "sub-tenant-1",
+        "sub-tenant-2",
+    ]
+    assert results[0]["location"] == [
+        {"name": "Customer tenant-1", "resource_id": "tenant-1"},
+        *LOCATION,
+    ]
+    assert results[0]["secret_data"]["tenant_id"] == "tenant-1"
+
+
+def test_only_completely_collected_tenants_are_checkpointed(
+    tenant_collector, checkpoint_conf
+):
+    tenant_collector.failing_tenant_ids = {"tenant-2"}
+    with checkpoint_sync("domain-a", SECRET_DATA):
+        run_sync(tenant_collector)
+
+    # the retry replays tenant-1 and collects tenant-2 again
+    tenant_collector.calls = []
+    tenant_collector.failing_tenant_ids = set()
+    with checkpoint_sync("domain-a", SECRET_DATA):
+        results = run_sync(tenant_collector)
+        assert get_checkpoint().resumed == 1
+
+    assert tenant_collector.calls == ["tenant-2"]
+    assert results[0]["location"][1:] == LOCATION
+
+
+def run_incremental_sync(tenant_collector: FakeTenantCollector, store) -> list:
+    sync_state = SyncState(store, "scope", 3600)
+    results = run_sync(tenant_collector, sync_state=sync_state)
+    sync_state.commit()
+    return results
+
+
+def test_unchanged_tenants_skip_their_crawl(tenant_collector, tmp_path):
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    results = run_incremental_sync(tenant_collector, store)
+    assert tenant_collector.calls == ["tenant-1", "tenant-2"]
+
+    tenant_collector.calls = []
+    assert run_incremental_sync(tenant_collector, store) == results
+    assert tenant_collector.calls == []
+
+    # a renamed subscription makes its tenant collected again
+    FakeBillingConnector.display_names["tenant-2"] = "Renamed"
+    results = run_incremental_sync(tenant_collector, store)
+    assert tenant_collector.calls == ["tenant-2"]
+    assert results[1]["name"] == "Renamed"
+
+
+def test_moved_subscriptions_make_their_tenant_collected_again(
+    tenant_collector, tmp_path
+):
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    run_incremental_sync(tenant_collector, store)
+
+    # the location map of tenant-1 was crawled again after a move
+    moved_location = [{"name": "Dev", "resource_id": "mg-dev"}]
+    tenant_collector.cached_location_maps["tenant-1"] = {"sub-tenant-1": moved_location}
+    tenant_collector.locations["tenant-1"] = moved_location
+    tenant_collector.calls = []
+    results = run_incremental_sync(tenant_collector, store)
+
+    assert tenant_collector.calls == ["tenant-1"]
+    assert results[0]["location"][1:] == moved_location
+
+    # without a cached location map, a tenant cannot be checked and is collected
+    tenant_collector.cached_location_maps.clear()
+    tenant_collector.calls = []
+    run_incremental_sync(tenant_collector, store)
+    assert tenant_collector.calls == ["tenant-1", "tenant-2"]
+
+
+def test_failed_tenants_are_not_stored(tenant_collector, tmp_path):
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    tenant_collector.failing_tenant_ids = {"tenant-2"}
+    run_incremental_sync(tenant_collector, store)
+
+    tenant_collector.calls = []
+    tenant_collector.failing_tenant_ids = set()
+    run_incremental_sync(tenant_collector, store)
+    assert tenant_collector.calls == ["tenant-2"]
+
+
+class FakeAsyncConnector:
+    """Async stand-in for the aio connectors, sharing FakeTenantCollector state."""
+
+    tenant_collector = None
+
+    def __init__(self, *args, secret_data=None, tenant_id=None, **kwargs):
+        self.tenant_id = tenant_id
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeAsyncBillingConnector(FakeAsyncConnector):
+    async def list_subscription(self, *args):
+        for subscription in FakeBillingConnector().list_subscription(*args):
+            yield subscription
+
+
+class FakeAsyncManagementGroupsConnector(FakeAsyncConnector):
+    async def list_entities(self, select=None, view=None, entity_type=None):
+        self.tenant_collector.calls.append(self.tenant_id)
+        if self.tenant_id in self.tenant_collector.failing_tenant_ids:
+            raise RuntimeError("crawl failed")
+
+        yield SimpleNamespace(
+            type="/subscriptions",
+            name=f"sub-{self.tenant_id}",
+            parent_name_chain=[location["resource_id"] for location in LOCATION],
+            parent_display_name_chain=[location["name"] for location in LOCATION],
+        )
+
+
+class FakeAsyncSubscriptionConnector(FakeAsyncConnector):
+    async def list_subscriptions(self):
+        yield SimpleNamespace(subscription_id=f"sub-{self.tenant_id}")
+
+
+@pytest.fixture
+def async_tenant_collector(tenant_collector, monkeypatch) -> FakeTenantCollector:
+    for module, name, fake in [
+        ("billing_connector", "AsyncBillingConnector", FakeAsyncBillingConnector),
+        (
+            "management_groups_connector",
+            "AsyncManagementGroupsConnector",
+            FakeAsyncManagementGroupsConnector,
+        ),
+        (
+            "subscription_connector",
+            "AsyncSubscriptionConnector",
+            FakeAsyncSubscriptionConnector,
+        ),
+    ]:
+        monkeypatch.setattr(f"plugin.connector.aio.{module}.{name}", fake)
+    monkeypatch.setattr(FakeAsyncConnector, "tenant_collector", tenant_collector)
+
+    location_map_cache.clear()
+    yield tenant_collector
+    location_map_cache.clear()
+
+
+def run_sync_async(**kwargs) -> list:
+    return asyncio.run(
+        MPAManager(**kwargs).sync_async(
+            {}, SECRET_DATA, "domain-a", billing_account_id="billing-account-1"
+        )
+    )
+
+
+def test_sync_async_results_match_sync(async_tenant_collector):
+    results = run_sync_async()
+
+    assert sorted(async_tenant_collector.calls) == CUSTOMER_TENANT_IDS
+    assert results == run_sync(async_tenant_collector)
+
+
+def test_sync_async_keeps_the_results_of_a_failing_tenant(async_tenant_collector):
+    async_tenant_collector.failing_tenant_ids = {"tenant-2"}
+
+    results = run_sync_async()
+
+    assert [result["resource_id"] for result in results] == [
+        "sub-tenant-1",
+        "sub-tenant-2",
+    ]
+    assert results[0]["location"][1:] == LOCATION
+    # located by its customer only
+    assert results[1]["location"] == [
+        {"name": "Customer tenant-2", "resource_id": "tenant-2"}
+    ]
+
+
+def test_sync_async_replays_checkpointed_tenants(
+    async_tenant_collector, checkpoint_conf
+):
+    async_tenant_collector.failing_tenant_ids = {"tenant-2"}
+    with checkpoint_sync("domain-a", SECRET_DATA):
+        run_sync_async()
+
+    # tenant-1 was checkpointed, its location map is not crawled again
+    location_map_cache.clear()
+    async_tenant_collector.calls = []
+    async_tenant_collector.failing_tenant_ids = set()
+    with checkpoint_sync("domain-a", SECRET_DATA):
+        results = run_sync_async()
+        assert get_checkpoint().resumed == 1
+
+    assert async_tenant_collector.calls == ["tenant-2"]
+    assert [result["location"][1:] for result in results] == [LOCATION, LOCATION]
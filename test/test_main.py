@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+
+from plugin import main
+from plugin.manager.base import AzureBaseManager
+
+SECRET_DATA = {
+    "tenant_id": "home-tenant",
+    "client_id": "client-a",
+    "client_secret": "secret-a",
+}
+
+
+class StubSyncState:
+    def __init__(self):
+        self.commits = []
+
+    def commit(self, remove_missing: bool = True) -> None:
+        self.commits.append(remove_missing)
+
+
+class StubBilling:
+    """Billing accounts of the tenant and what each one syncs: a list of
+    subscription ids, or the exception it raises.
+    """
+
+    def __init__(self):
+        self.billing_accounts = []
+        self.outcomes = {}
+
+    def add(self, name: str, agreement_type: str, outcome) -> None:
+        self.billing_accounts.append(
+            SimpleNamespace(name=name, agreement_type=agreement_type)
+        )
+        self.outcomes[name] = outcome
+
+    def get_manager_by_agreement_type(self, agreement_type: str):
+        outcomes = self.outcomes
+
+        class StubManager:
+            def __init__(self, sync_state=None):
+                self.agreement_type = agreement_type
+
+            def sync(
+                self,
+                options,
+                secret_data,
+                domain_id,
+                billing_account_id=None,
+                schema_id=None,
+            ):
+                outcome = outcomes[billing_account_id]
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+                for subscription_id in outcome:
+                    yield {
+                        "name": f"{agreement_type} {subscription_id}",
+                        "resource_id": subscription_id,
+                        "tags": {},
+                        "location": [],
+                    }
+
+        return StubManager
+
+
+@pytest.fixture
+def billing(monkeypatch) -> StubBilling:
+    billing = StubBilling()
+    monkeypatch.setattr(
+        AzureBaseManager,
+        "list_billing_accounts",
+        staticmethod(lambda secret_data: iter(billing.billing_accounts)),
+    )
+    monkeypatch.setattr(
+        AzureBaseManager,
+        "get_manager_by_agreement_type",
+        staticmethod(billing.get_manager_by_agreement_type),
+    )
+    return billing
+
+
+@pytest.fixture
+def sync_state(monkeypatch) -> StubSyncState:
+    sync_state = StubSyncState()
+    monkeypatch.setattr(main, "get_sync_state", lambda *args: sync_state)
+    return sync_state
+
+
+def sync_billing_accounts() -> list:
+    return main._sync_billing_accounts({}, SECRET_DATA, "domain-a")
+
+
+def test_failed_billing_account_keeps_the_others_results(billing, sync_state):
+    billing.add("ea-1", "EnterpriseAgreement", ["sub-1", "sub-2"])
+    billing.add("mpa-1", "MicrosoftPartnerAgreement", RuntimeError("forbidden"))
+
+    results = sync_billing_accounts()
+
+    assert [result["resource_id"] for result in results] == ["sub-1", "sub-2"]
+    # subscriptions of the failed billing account are not removed from the state
+    assert sync_state.commits == [False]
+
+
+def test_all_billing_accounts_failing_raises(billing, sync_state):
+    billing.add("ea-1", "EnterpriseAgreement", RuntimeError("forbidden"))
+    billing.add("mpa-1", "MicrosoftPartnerAgreement", ValueError("bad request"))
+
+    with pytest.raises(RuntimeError):
+        sync_billing_accounts()
+
+    assert sync_state.commits == []
+
+
+def test_subscriptions_are_deduplicated_by_resource_id(billing, sync_state):
+    billing.add("mpa-1", "MicrosoftPartnerAgreement", ["sub-1", "SUB-2"])
+    billing.add("ea-1", "EnterpriseAgreement", ["sub-2", "sub-3"])
+
+    results = sync_billing_accounts()
+
+    # resource ids are compared case-insensitively, and the billing agreement
+    # with the highest precedence provides the result
+    assert [result["resource_id"] for result in results] == ["sub-1", "sub-2", "sub-3"]
+    assert results[1]["name"] == "EnterpriseAgreement sub-2"
+    assert sync_state.commits == [True]